@@ -4,10 +4,12 @@ from scipy.optimize import linprog
 import matplotlib.pyplot as plt
 import datetime
 
+from Backtesting.ScraperTools.OddsStore import bestOdds, matchOdds, readOdds
+
 
 '''
 Author: Jonathan Chow
-Date Modified: 2019-08-17
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Reads in maximum odds are determines whether there is arbitrage potential.
@@ -35,53 +37,31 @@ def readHistoricalGameData(season):
 
 
 def getOdds(season):
-    # Odds scraped from OddsPortal (e.g. http://www.oddsportal.com/hockey/usa/nhl-2015-2016/results/#/page/4/)
-    bookmakerOdds = pd.read_json('HistoricalOdds/Season' + str(season) + '.json')
-    bookmakerOdds['date'] = pd.to_datetime(bookmakerOdds['day'] + ' ' + bookmakerOdds['time'], format='%d %b %Y %H:%M')
-    bookmakerOdds.drop(['day', 'time'], axis=1, inplace=True)
+    # Odds scraped from OddsPortal (e.g. http://www.oddsportal.com/hockey/usa/nhl-2015-2016/results/#/page/4/), one row
+    # per game and bookmaker (see ScraperTools/OddsStore.py)
+    bookmakerOdds = readOdds(season, 'HistoricalOdds/')
     bookmakerOdds = bookmakerOdds.loc[bookmakerOdds['pre-season'] == False]
 
     return bookmakerOdds
 
 
 def mergeOdds(trainingData, bookmakerOdds, allowedBookmakers):
-    oddsDict = {'currTeam.odds': [], 'oppTeam.odds': [], 'tie.odds': []}
+    # Best odds over the allowed bookmakers, worked out once per game
+    gameOdds = bestOdds(bookmakerOdds, allowedBookmakers)
 
     teamTable = pd.concat([trainingData['team.name'].rename('home'), trainingData['team.name'].shift(-1).rename('away'),
-                           trainingData['game.date']], axis=1).iloc[::2, :]
+                           trainingData['game.date'].rename('date')], axis=1).iloc[::2, :]
 
-    for key in list(oddsDict.keys()):
-        oddsDict[key] = list(teamTable.apply(lambda row: mergeOddsHelper(row, bookmakerOdds, key, allowedBookmakers), axis=1))
-        oddsDict[key] = [item for sublist in oddsDict[key] for item in sublist]
+    # [home, tie, away] odds of each game, 0 if there are none
+    matchedOdds = matchOdds(teamTable, gameOdds).to_numpy()
 
-        trainingData[key] = oddsDict[key]
+    trainingData['currTeam.odds'] = matchedOdds[:, [0, 2]].ravel()
+    trainingData['oppTeam.odds'] = matchedOdds[:, [2, 0]].ravel()
+    trainingData['tie.odds'] = np.repeat(matchedOdds[:, 1], 2)
 
     return trainingData
 
 
-def mergeOddsHelper(row, odds, side, allowedBookmakers):
-    restricted = odds.loc[(odds['home'] == row['home']) & (odds['away'] == row['away']) &
-                          ((odds['date'] + datetime.timedelta(hours=10)) >= row['game.date']) &
-                          ((odds['date'] - datetime.timedelta(hours=10)) <= row['game.date'])]
-
-    if restricted.empty:
-        return [0, 0]
-
-    if 'currTeam' in side:
-        euroOdd = [max([0] + [value['home.odds'] for key, value in (restricted['odds'].iloc[0]).items() if key in allowedBookmakers])]
-        euroOdd = euroOdd + [max([0] + [value['away.odds'] for key, value in (restricted['odds'].iloc[0]).items() if key in allowedBookmakers])]
-    elif 'oppTeam' in side:
-        euroOdd = [max([0] + [value['away.odds'] for key, value in (restricted['odds'].iloc[0]).items() if key in allowedBookmakers])]
-        euroOdd = euroOdd + [max([0] + [value['home.odds'] for key, value in (restricted['odds'].iloc[0]).items() if key in allowedBookmakers])]
-    else:
-        euroOdd = [max([0] + [value['tie.odds'] for key, value in (restricted['odds'].iloc[0]).items() if key in allowedBookmakers])] * 2
-
-    if len(restricted) > 1:
-        print(str(datetime.datetime.now()) + ': Merging by time and teams not unique on ' + str(row['game.date']))
-
-    return euroOdd
-
-
 if __name__ == '__main__':
     print(str(datetime.datetime.now()) + ': Started')
 
@@ -1,13 +1,20 @@
 import json
-import requests
-import time
+import numpy as np
 import pandas as pd
 import datetime
+import re
+
+from Backtesting.ScraperTools.HTTPClient import getClient
+from Backtesting.ScraperTools.Orchestrator import reportProgress
+from Backtesting.ScraperTools.RaggedStore import RaggedStore
+from Backtesting.ScraperTools.RetryScheduler import RetryScheduler
+from Backtesting.ScraperTools.SeasonStore import SeasonStore, recordsToFrame
+from Backtesting.ScraperTools.Telemetry import getTelemetry
 
 
 '''
 Author: Jonathan Chow
-Date Modified: 2020-01-11
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Code to extract features from data.nba.net. A simple guide can be found at
@@ -15,63 +22,92 @@ https://github.com/kashav/nba.js/blob/master/docs/api/DATA.md.
 '''
 
 
-# Breaks if periods are not 20min (with 5min overtime)
-def calcGameTime(eventTime, perNum):
-    rawTime = eventTime.split(':')
-    timeInPeriod = float(rawTime[0]) * 60.0 + float(rawTime[1])
-    timeInPeriod = 720.0 - timeInPeriod if perNum < 5 else 300.0 - timeInPeriod
-    gameTime = sum([720.0 if per < 5 else 300.0 for per in range(1, perNum)]) + timeInPeriod
-
-    return gameTime
-
-
-def accessAPI(url, attempts):
-    if attempts > 5:
-        print(str(datetime.datetime.now()) + ': Attempt limit exceeded to ' + url)
-        return -1, ''
-    else:
-        try:
-            request = requests.get(url)
-
-            if 200 <= request.status_code < 300:
-                # Success
-                status = 0
-                webText = request.text
-            elif request.status_code == 429:
-                # Sent too many requests too quickly
-                print(str(datetime.datetime.now()) + ': Too many requests to ' + url)
-                time.sleep(300)
-                status, webText = accessAPI(url, attempts + 1)
-            else:
-                print(str(datetime.datetime.now()) + ': Received HTTP response code ' + str(request.status_code) + ' from ' + url)
-                time.sleep(300)
-                status, webText = accessAPI(url, attempts + 1)
-        except ConnectionResetError:
-            print(str(datetime.datetime.now()) + ': Connection to ' + url + ' reset by peer')
-            status, webText = accessAPI(url, attempts + 1)
-        except ConnectionAbortedError:
-            print(str(datetime.datetime.now()) + ': Connection to ' + url + ' aborted (likely lost wifi connection)')
-            time.sleep(3600)
-            status, webText = accessAPI(url, attempts + 1)
-
-        return status, webText
-
-
-def getGameIdDicts(season):
+# Breaks if periods are not 12min (with 5min overtime)
+def calcGameTimes(clocks, periods):
+    # Clock counts down from the start of each period, so game time is the period's start plus time elapsed in it
+    maxPeriod = int(periods.max())
+    periodLengths = np.where(np.arange(1, maxPeriod + 1) < 5, 720.0, 300.0)
+    periodStarts = np.concatenate([[0.0], np.cumsum(periodLengths)[:-1]])
+
+    clockParts = pd.Series(clocks).str.split(':', n=1, expand=True).astype(float).values
+    timeLeft = clockParts[:, 0] * 60.0 + clockParts[:, 1]
+
+    return periodStarts[periods - 1] + periodLengths[periods - 1] - timeLeft
+
+
+def calcRunningPoints(periodPlays):
+    # periodPlays is a list of (period, plays) with periods in order. Returns {'time', 'points'} arrays at every score
+    # change for the home and away teams
+    plays = [play for _, periodList in periodPlays for play in periodList]
+
+    if not plays:
+        return [{'time': np.zeros(0), 'points': np.zeros(0, dtype=int)}] * 2
+
+    periods = np.repeat([period for period, _ in periodPlays], [len(periodList) for _, periodList in periodPlays])
+    gameTimes = calcGameTimes([play['clock'] for play in plays], periods)
+
+    runningPoints = []
+
+    for scoreKey in ['hTeamScore', 'vTeamScore']:
+        scores = np.array([play[scoreKey] for play in plays], dtype=int)
+        changes = np.concatenate([[True], scores[1:] != scores[:-1]])
+
+        runningPoints.append({'time': gameTimes[changes], 'points': scores[changes]})
+
+    return runningPoints[0], runningPoints[1]
+
+
+class FinishedPeriods(object):
+    # Cache predicate of the client, only play-by-play of finished games is cached as a period fetched mid-game would
+    # otherwise never be updated. Games are added by the process fetching them, from the gameIdDicts it was given
+    def __init__(self):
+        self.finalGameIds = set()
+
+    def add(self, gameIdDicts):
+        self.finalGameIds.update(gameIdDict['id'] for gameIdDict in gameIdDicts if gameIdDict['final'])
+
+    def __call__(self, url, webText):
+        search = re.search(r'/([0-9]+)_pbp_[0-9]+\.json', url)
+
+        return search is None or search.group(1) in self.finalGameIds
+
+
+def setResponseCache(cacheDir, replay=False):
+    getClient().setResponseCache(cacheDir, replay, FinishedPeriods())
+
+
+def accessAPI(url):
+    # Single request, failures are retried with backoff by the retry scheduler
+    scheduler = RetryScheduler(maxWorkers=1)
+
+    for _, webText in scheduler.fetchAll([(url, url)]):
+        if webText is None:
+            print(str(datetime.datetime.now()) + ': ' + scheduler.failed[url])
+            return -1, ''
+
+        return 0, webText
+
+
+def getGameIdDicts(season, finalOnly=False):
     gameIdDicts = []
     nbaUrl = 'http://data.nba.net/data/10s/prod/v1/' + str(season) + '/schedule.json'
 
-    responseCode, nbaJson = accessAPI(nbaUrl, 1)
+    responseCode, nbaJson = accessAPI(nbaUrl)
 
     if responseCode == 0:
         nbaDict = json.loads(nbaJson)
 
         for game in nbaDict['league']['standard']:
+            # Games that have not finished yet (statusNum 3 is final) would be stored without their play-by-play
+            if finalOnly and game['statusNum'] != 3:
+                continue
+
             if game['seasonStageId'] == 2 or game['seasonStageId'] == 4:  # Only add regular season and playoff games
                 gameIdDicts.append({'id': str(game['gameId']),
                                     'type': 'R' if game['seasonStageId'] == 2 else 'P',
                                     'date': str(game['gameUrlCode']).split('/')[0],
                                     'periods': int(game['period']['current']),
+                                    'final': game['statusNum'] == 3,
                                     'hteam.id': str(game['hTeam']['teamId']),
                                     'vteam.id': str(game['vTeam']['teamId'])})  # Specific games are references by id and date
 
@@ -80,37 +116,123 @@ def getGameIdDicts(season):
     return gameIdDicts
 
 
-def getBaseGameInformation(gameIdDict):
-    baseInformation = pd.DataFrame()
+def getPeriodUrls(gameIdDict):
+    return [((gameIdDict['id'], period), 'http://data.nba.net/data/10s/prod/v1/' + gameIdDict['date'] + '/' + gameIdDict['id'] + '_pbp_' + str(period) + '.json')
+            for period in range(1, gameIdDict['periods'] + 1)]
+
+
+def buildGameRecords(gameIdDict, periodPlays):
+    hPoints, vPoints = calcRunningPoints(periodPlays)
+
+    gameRecords = []
+
+    for side, teamId, runningPoints in [('home', gameIdDict['hteam.id'], hPoints), ('away', gameIdDict['vteam.id'], vPoints)]:
+        gameRecords.append({'game.id': gameIdDict['id'],
+                            'side': side,
+                            'home': 1 if side == 'home' else 0,
+                            'away': 1 if side == 'away' else 0,
+                            'final.period': gameIdDict['periods'],
+                            'game.date': gameIdDict['date'],
+                            'game.type': gameIdDict['type'],
+                            'team.id': teamId,
+                            'running.points': runningPoints})
+
+    getTelemetry().increment('scraper_games_total', {'source': 'nba'})
+
+    return gameRecords
+
+
+def getBaseGameRecordsConcurrent(gameIdDicts, scheduler):
+    # Every period of every game goes through one scheduler, so periods and games are fetched concurrently. Records are
+    # yielded in the order of gameIdDicts
+    gameIdDicts = list(gameIdDicts)
+
+    if isinstance(getClient().cacheable, FinishedPeriods):
+        getClient().cacheable.add(gameIdDicts)
+
+    periodJsons = scheduler.fetchAll(periodUrl for gameIdDict in gameIdDicts for periodUrl in getPeriodUrls(gameIdDict))
+
+    for gameIdDict in gameIdDicts:
+        periodPlays = []
+
+        for _ in range(gameIdDict['periods']):
+            (gameId, period), nbaJson = next(periodJsons)
+            periodPlays.append((period, json.loads(nbaJson)['plays'] if nbaJson is not None else None))
+
+        # A game missing any period is left out (and in scheduler.failed) so the next run fetches it again
+        if any(plays is None for _, plays in periodPlays):
+            yield []
+        else:
+            yield buildGameRecords(gameIdDict, periodPlays)
+
+
+def getBaseGameRecords(gameIdDict, scheduler=None):
+    scheduler = scheduler if scheduler is not None else RetryScheduler()
+
+    return next(getBaseGameRecordsConcurrent([gameIdDict], scheduler))
+
+
+def getBaseGameInformation(gameIdDict, scheduler=None):
+    return recordsToFrame(getBaseGameRecords(gameIdDict, scheduler))
+
+
+def openSeasonStore(season, outputDir):
+    # Running points are kept out of the CSV, as time and score arrays in their own store
+    pointsStore = RaggedStore(outputDir + 'Season' + str(season) + '_RunningPoints')
+
+    return SeasonStore(outputDir + 'Season' + str(season) + '.csv', raggedStores={'running.points': pointsStore}), pointsStore
+
+
+def scrapeSeason(season, outputDir, maxWorkers=8):
+    # Games already in the season's checkpoint log are never fetched again. Only finished games are fetched, so games
+    # still to be played are left out of the log and picked up by a later run
+    reportProgress(season, 0, 0)
+
+    seasonStore, pointsStore = openSeasonStore(season, outputDir)
+    scheduler = RetryScheduler(maxWorkers)
+    gameList = [gameIdDict for gameIdDict in getGameIdDicts(season, True) if not seasonStore.isComplete(gameIdDict['id'])]
+
+    print(str(datetime.datetime.now()) + ': Fetching ' + str(len(gameList)) + ' games from ' + str(season))
+
+    for gamesDone, gameRecords in enumerate(getBaseGameRecordsConcurrent(gameList, scheduler), 1):
+        seasonStore.append(gameRecords)
+        reportProgress(season, gamesDone, len(gameList))
+
+    seasonStore.flush()
+    pointsStore.compact()
+    scheduler.reportFailures('play-by-play files from ' + str(season))
 
-    baseInformation['home'] = [1, 0]
-    baseInformation['away'] = [0, 1]
 
-    baseInformation['final.period'] = [gameIdDict['periods']] * 2
-    baseInformation['game.date'] = [gameIdDict['date']] * 2
-    baseInformation['game.type'] = [gameIdDict['type']] * 2
-    baseInformation['team.id'] = [gameIdDict['hteam.id'], gameIdDict['vteam.id']]
+# Job queue (see ScraperTools/JobQueue.py and scrapeJobs in ScraperTools/Orchestrator.py), one job per game with the
+# game's details as payload and its first play-by-play file as URL
 
-    baseInformation.index = [[gameIdDict['id']] * 2, ['home', 'away']]
 
-    hPoints = []
-    vPoints = []
+def enqueueSeasons(jobQueue, seasonList, outputDir):
+    # Only finished games are queued, as in scrapeSeason
+    for season in seasonList:
+        seasonStore, _ = openSeasonStore(season, outputDir)
+        # A game without periods has no play-by-play file to give as its URL
+        jobQueue.enqueue('nba', season, ((gameIdDict['id'], getPeriodUrls(gameIdDict)[0][1] if gameIdDict['periods'] else '',
+                                          gameIdDict)
+                                         for gameIdDict in getGameIdDicts(season, True)
+                                         if not seasonStore.isComplete(gameIdDict['id'])))
 
-    for period in range(1, gameIdDict['periods'] + 1):
-        nbaPeriodUrl = 'http://data.nba.net/data/10s/prod/v1/' + gameIdDict['date'] + '/' + gameIdDict['id'] + '_pbp_' + str(period) + '.json'
 
-        responseCode, nbaJson = accessAPI(nbaPeriodUrl, 1)
+def handleJobs(jobs, maxWorkers=8):
+    scheduler = RetryScheduler(maxWorkers)
 
-        if responseCode == 0:
-            nbaDict = json.loads(nbaJson)
+    for job, gameRecords in zip(jobs, getBaseGameRecordsConcurrent([job.payload for job in jobs], scheduler)):
+        reasons = [reason for (gameId, _), reason in scheduler.failed.items() if gameId == job.key]
+        yield job, gameRecords if gameRecords else None, '; '.join(reasons)
 
-            for play in nbaDict['plays']:
-                if len(hPoints) == 0 or hPoints[-1][1] != int(play['hTeamScore']):
-                    hPoints.append((calcGameTime(play['clock'], period), int(play['hTeamScore'])))
 
-                if len(vPoints) == 0 or vPoints[-1][1] != int(play['vTeamScore']):
-                    vPoints.append((calcGameTime(play['clock'], period), int(play['vTeamScore'])))
+def exportSeason(jobQueue, season, outputDir):
+    # Appends every finished game not yet in the season's store, in game id order
+    seasonStore, pointsStore = openSeasonStore(season, outputDir)
 
-    baseInformation['running.points'] = [hPoints, vPoints]
+    for gameId, gameRecords in jobQueue.results('nba', season):
+        if not seasonStore.isComplete(gameId):
+            seasonStore.append(gameRecords)
 
-    return baseInformation
+    seasonStore.flush()
+    pointsStore.compact()
@@ -1,9 +1,11 @@
 from Backtesting.NBAAPIScraper.APIScraper import *
+from Backtesting.ScraperTools.Orchestrator import scrapeJobs, scrapeSeasons
+import functools
 
 
 '''
 Author: Jonathan Chow
-Date Modified: 2020-01-11
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Code to extract features from data.nba.net. A simple guide can be found at
@@ -17,16 +19,44 @@ if __name__ == '__main__':
     # seasonList = [2015, 2016, 2017, 2018]
     seasonList = [2017, 2016, 2015]
 
-    for season in seasonList:
-        gameList = getGameIdDicts(season)
-        gameData = pd.DataFrame()
-
-        for gameIdDict in gameList:
-            gameData = pd.concat([gameData, getBaseGameInformation(gameIdDict)], sort=True, ignore_index=False)
-
-        with open('HistoricalGameData_WithOT/Season' + str(season) + '.csv', mode='w+') as dataFile:
-            gameData.to_csv(dataFile, encoding='utf-8', index=True)
-
-        print(str(datetime.datetime.now()) + ': Finished ' + str(season))
+    # Seasons scraped at once (one process each) and maximum number of play-by-play files in flight per season
+    processes = 3
+    maxWorkers = 8
+
+    # Combined limit over all processes as (requests per second, burst)
+    hostRates = {'data.nba.net': (10, 20)}
+
+    # Responses are cached in cacheDir (None to disable), except schedules and play-by-play of unfinished games. With
+    # replayOnly, nothing is fetched from the API
+    cacheDir = 'ResponseCache/'
+    replayOnly = False
+
+    # Queue every game in a SQLite job table instead, shared by all processes. A killed run resumes from the table
+    jobQueuePath = None
+
+    outputDir = 'HistoricalGameData_WithOT/'
+
+    # Request latencies, status codes, retries and games per second, in Prometheus text format (None to only print a
+    # summary at the end)
+    metricsPath = 'NBAAPIScraper.prom'
+
+    if jobQueuePath is not None:
+        scrapeJobs(jobQueuePath, 'nba', seasonList,
+                   functools.partial(enqueueSeasons, outputDir=outputDir),
+                   functools.partial(handleJobs, maxWorkers=maxWorkers),
+                   functools.partial(exportSeason, outputDir=outputDir),
+                   processes=processes,
+                   hostRates=hostRates,
+                   initializer=setResponseCache,
+                   initArgs=(cacheDir, replayOnly),
+                   metricsPath=metricsPath)
+    else:
+        scrapeSeasons(seasonList,
+                      functools.partial(scrapeSeason, outputDir=outputDir, maxWorkers=maxWorkers),
+                      processes=processes,
+                      hostRates=hostRates,
+                      initializer=setResponseCache,
+                      initArgs=(cacheDir, replayOnly),
+                      metricsPath=metricsPath)
 
     print(str(datetime.datetime.now()) + ': Finished')
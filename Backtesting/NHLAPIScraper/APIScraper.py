@@ -1,13 +1,20 @@
 import json
-import requests
-import time
-import pandas as pd
+import numpy as np
 import datetime
+import re
+
+from Backtesting.ScraperTools.FieldProjection import projectFields
+from Backtesting.ScraperTools.HTTPClient import getClient
+from Backtesting.ScraperTools.Orchestrator import reportProgress
+from Backtesting.ScraperTools.RaggedStore import RaggedStore
+from Backtesting.ScraperTools.RetryScheduler import RetryScheduler
+from Backtesting.ScraperTools.SeasonStore import SeasonStore, recordsToFrame
+from Backtesting.ScraperTools.Telemetry import getTelemetry
 
 
 '''
 Author: Jonathan Chow
-Date Modified: 2019-04-09
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Code to extract features from statsapi.web.nhl.com/api/. Explanations for column header meanings can be found at
@@ -15,49 +22,45 @@ http://www.nhl.com/stats/glossary and API documentation can be found at https://
 '''
 
 
-def accessAPI(url, attempts):
-    if attempts > 5:
-        print(str(datetime.datetime.now()) + ': Attempt limit exceeded to ' + url)
-        return -1, ''
-    else:
-        try:
-            request = requests.get(url)
-
-            if 200 <= request.status_code < 300:
-                # Success
-                status = 0
-                webText = request.text
-            elif request.status_code == 429:
-                # Sent too many requests too quickly
-                print(str(datetime.datetime.now()) + ': Too many requests to ' + url)
-                time.sleep(300)
-                status, webText = accessAPI(url, attempts + 1)
-            else:
-                print(str(datetime.datetime.now()) + ': Received HTTP response code ' + str(request.status_code) + ' from ' + url)
-                time.sleep(300)
-                status, webText = accessAPI(url, attempts + 1)
-        except ConnectionResetError:
-            print(str(datetime.datetime.now()) + ': Connection to ' + url + ' reset by peer')
-            status, webText = accessAPI(url, attempts + 1)
-        except ConnectionAbortedError:
-            print(str(datetime.datetime.now()) + ': Connection to ' + url + ' aborted (likely lost wifi connection)')
-            time.sleep(3600)
-            status, webText = accessAPI(url, attempts + 1)
-
-        return status, webText
-
-
-def getGameIds(season):
+def finishedFeed(url, webText):
+    # Only feeds of finished games are cached, a feed fetched mid-game would otherwise never be updated
+    if '/feed/live' not in url:
+        return True
+
+    return re.search(r'"abstractGameState"\s*:\s*"Final"', webText) is not None
+
+
+def setResponseCache(cacheDir, replay=False):
+    getClient().setResponseCache(cacheDir, replay, finishedFeed)
+
+
+def accessAPI(url):
+    # Single request, failures are retried with backoff by the retry scheduler
+    scheduler = RetryScheduler(maxWorkers=1)
+
+    for _, webText in scheduler.fetchAll([(url, url)]):
+        if webText is None:
+            print(str(datetime.datetime.now()) + ': ' + scheduler.failed[url])
+            return -1, ''
+
+        return 0, webText
+
+
+def getGameIds(season, finalOnly=False):
     gameIds = []
     nhlUrl = 'https://statsapi.web.nhl.com/api/v1/schedule?season=' + str(season) + str(season + 1)
 
-    responseCode, nhlJson = accessAPI(nhlUrl, 1)
+    responseCode, nhlJson = accessAPI(nhlUrl)
 
     if responseCode == 0:
         nhlDict = json.loads(nhlJson)
 
         for dates in nhlDict['dates']:
             for game in dates['games']:
+                # Games that have not finished yet would be stored without a result
+                if finalOnly and game['status']['abstractGameState'] != 'Final':
+                    continue
+
                 gameIds.append(str(game['gamePk']))
 
     # Remove preseason and all-star games
@@ -68,62 +71,236 @@ def getGameIds(season):
     return gameIds
 
 
+# Same fields are available from a game's feed or inline from the expanded schedule
+def buildGameRecords(gameId, gameType, dateTime, linescore, teams):
+    gameDate = datetime.datetime.strptime(dateTime[:-4], '%Y-%m-%dT%H:%M')
+
+    homeGoals = linescore['teams']['home']['goals']
+    awayGoals = linescore['teams']['away']['goals']
+
+    overtime = True if linescore['currentPeriod'] >= 4 else False
+
+    shootout = '1' if linescore['hasShootout'] else 0
+
+    if not overtime:
+        goals = [homeGoals, awayGoals]
+        otWinner = ''
+
+        if homeGoals > awayGoals:
+            winner = 'home'
+        elif homeGoals == awayGoals:
+            winner = 'tie'
+        else:
+            winner = 'away'
+    else:
+        winner = 'tie'
+        goals = [min(homeGoals, awayGoals)] * 2
+        otWinner = 'home' if homeGoals > awayGoals else 'away'
+
+    gameRecords = []
+
+    for sideIter, side in enumerate(['home', 'away']):
+        team = teams[side]
+        teamId = str(team['id'])
+
+        gameRecords.append({'game.id': gameId,
+                            'side': side,
+                            'game.type': gameType,
+                            'game.date': gameDate,
+                            'final.period': linescore['currentPeriod'],
+                            'pulledGoalie': 0 if linescore['teams'][side]['goaliePulled'] is False else 1,
+                            'shootout': shootout,
+                            'goals': goals[sideIter],
+                            'game.winner': winner,
+                            'game.ot.winner': otWinner,
+                            'home': 1 if side == 'home' else 0,
+                            'away': 1 if side == 'away' else 0,
+                            # Conference and divisions only make sense post-2013
+                            'conference.id': str(team['conference']['id']),
+                            'division.id': str(team['division']['id']),
+                            'team.id': teamId,
+                            # Montreal Canadiens team name is not properly parsed
+                            'team.name': team['name'] if teamId != '8' else 'Montreal Canadiens'})
+
+    getTelemetry().increment('scraper_games_total', {'source': 'nhl'})
+
+    return gameRecords
+
+
+def getFeedUrl(gameId):
+    return 'https://statsapi.web.nhl.com/api/v1/game/' + gameId + '/feed/live'
+
+
+def parsePlays(allPlays):
+    # One entry per play. Coordinates are NaN and team is blank for plays without them (e.g. period start), goals are
+    # the score after the play
+    def periodSeconds(periodTime):
+        return int(periodTime[:-3]) * 60 + int(periodTime[-2:])
+
+    return {'period': np.array([play['about']['period'] for play in allPlays], dtype=np.int8),
+            'period.time': np.array([periodSeconds(play['about']['periodTime']) for play in allPlays], dtype=np.int16),
+            'event.type': [play['result']['eventTypeId'] for play in allPlays],
+            'team.id': [str(play['team']['id']) if 'team' in play else '' for play in allPlays],
+            'x': np.array([play['coordinates'].get('x', np.nan) for play in allPlays], dtype=np.float32),
+            'y': np.array([play['coordinates'].get('y', np.nan) for play in allPlays], dtype=np.float32),
+            'home.goals': np.array([play['about']['goals']['home'] for play in allPlays], dtype=np.int16),
+            'away.goals': np.array([play['about']['goals']['away'] for play in allPlays], dtype=np.int16)}
+
+
+# Fields of a game's feed that make up its records, the play-by-play is only decoded when it is kept
+feedFields = ['gameData.game.type', 'gameData.datetime.dateTime', 'gameData.teams', 'liveData.linescore']
+
+
+def parseBaseGameRecords(gameId, nhlJson, playByPlay=False):
+    nhlDict = projectFields(nhlJson, feedFields + (['liveData.plays.allPlays'] if playByPlay else []))
+    gameData = nhlDict['gameData']
+
+    gameRecords = buildGameRecords(gameId, gameData['game']['type'], gameData['datetime']['dateTime'],
+                                   nhlDict['liveData']['linescore'], gameData['teams'])
+
+    if playByPlay:
+        # Plays belong to the game rather than a side, so they ride on the home record only
+        gameRecords[0]['plays'] = parsePlays(nhlDict['liveData'].get('plays', {}).get('allPlays', []))
+
+    return gameRecords
+
+
+def getBaseGameRecords(gameId):
+    responseCode, nhlJson = accessAPI(getFeedUrl(gameId))
+
+    if responseCode != 0:
+        return []
+
+    return parseBaseGameRecords(gameId, nhlJson)
+
+
 def getBaseGameInformation(gameId):
-    baseInformation = pd.DataFrame()
-    nhlUrl = 'https://statsapi.web.nhl.com/api/v1/game/' + gameId + '/feed/live'
+    return recordsToFrame(getBaseGameRecords(gameId))
+
+
+def getBaseGameRecordsConcurrent(gameIds, scheduler, playByPlay=False):
+    # Feeds are fetched on the scheduler's thread pool and yielded in gamePk order regardless of which request finishes
+    # first. Games that cannot be fetched yield no records and are left in scheduler.failed
+    for gameId, nhlJson in scheduler.fetchAll((gameId, getFeedUrl(gameId)) for gameId in sorted(gameIds)):
+        yield parseBaseGameRecords(gameId, nhlJson, playByPlay) if nhlJson is not None else []
 
-    responseCode, nhlJson = accessAPI(nhlUrl, 1)
+
+def getSeasonRecords(season, scheduler, finalOnly=False, skipGameIds=()):
+    # One schedule request with the linescore and full team details inlined covers every game of the season
+    seasonRecords = {}
+    missingGameIds = []
+    nhlUrl = 'https://statsapi.web.nhl.com/api/v1/schedule?season=' + str(season) + str(season + 1) + \
+             '&expand=schedule.linescore,schedule.teams'
+
+    responseCode, nhlJson = accessAPI(nhlUrl)
 
     if responseCode == 0:
         nhlDict = json.loads(nhlJson)
 
-        baseInformation['game.type'] = [nhlDict['gameData']['game']['type']] * 2
-        baseInformation['game.date'] = [datetime.datetime.strptime(nhlDict['gameData']['datetime']['dateTime'][:-4], '%Y-%m-%dT%H:%M')] * 2
+        for dates in nhlDict['dates']:
+            for game in dates['games']:
+                gameId = str(game['gamePk'])
 
-        homeGoals = nhlDict['liveData']['linescore']['teams']['home']['goals']
-        awayGoals = nhlDict['liveData']['linescore']['teams']['away']['goals']
+                # Remove preseason and all-star games
+                if not 1 < int(gameId[5:6]) < 4 or gameId in skipGameIds:
+                    continue
 
-        overtime = True if nhlDict['liveData']['linescore']['currentPeriod'] >= 4 else False
+                if finalOnly and game['status']['abstractGameState'] != 'Final':
+                    continue
 
-        baseInformation['final.period'] = [nhlDict['liveData']['linescore']['currentPeriod']] * 2
+                try:
+                    seasonRecords[gameId] = buildGameRecords(gameId, game['gameType'], game['gameDate'], game['linescore'],
+                                                             {side: game['teams'][side]['team'] for side in ['home', 'away']})
+                except KeyError:
+                    # Linescore or team details not inlined for this game, so read them from its own feed
+                    missingGameIds.append(gameId)
 
-        baseInformation['pulledGoalie'] = [0 if nhlDict['liveData']['linescore']['teams']['home']['goaliePulled'] is False else 1,
-                                           0 if nhlDict['liveData']['linescore']['teams']['away']['goaliePulled'] is False else 1]
+    if missingGameIds:
+        print(str(datetime.datetime.now()) + ': Falling back to game feeds for ' + str(len(missingGameIds)) + ' games')
 
-        baseInformation['shootout'] = ['1'] * 2 if nhlDict['liveData']['linescore']['hasShootout'] else [0] * 2
+    for gameId, gameRecords in zip(sorted(missingGameIds), getBaseGameRecordsConcurrent(missingGameIds, scheduler)):
+        seasonRecords[gameId] = gameRecords
 
-        if not overtime:
-            baseInformation['goals'] = [homeGoals, awayGoals]
-            baseInformation['game.ot.winner'] = [''] * 2
+    return [seasonRecords[gameId] for gameId in sorted(seasonRecords)]
+
+
+def openSeasonStore(season, outputDir, playByPlay=False):
+    # Returns the season's store and its ragged stores (plays, when playByPlay is set)
+    raggedStores = {}
+
+    if playByPlay:
+        raggedStores['plays'] = RaggedStore(outputDir + 'Season' + str(season) + '_Plays',
+                                            encodedColumns=['event.type', 'team.id'])
+
+    return SeasonStore(outputDir + 'Season' + str(season) + '.csv', raggedStores=raggedStores), raggedStores
+
+
+def isStored(seasonStore, raggedStores, gameId):
+    # The plays store keeps its own log, so turning playByPlay on for a season already scraped fetches every game again
+    # for its plays (the rows already in the CSV are not written twice)
+    return seasonStore.isComplete(gameId) and all((gameId, 'home') in raggedStore for raggedStore in raggedStores.values())
+
+
+def scrapeSeason(season, outputDir, maxWorkers=8, bulkSchedule=True, playByPlay=False):
+    # Games already in the season's checkpoint log are never fetched again. Only finished games are fetched, so games
+    # still to be played are left out of the log and picked up by a later run. With bulkSchedule, records come from the expanded schedule rather than one feed per game. With playByPlay,
+    # every play is also kept, in a columnar store next to the CSV (this needs every game's feed, so overrides
+    # bulkSchedule)
+    reportProgress(season, 0, 0)
+
+    seasonStore, raggedStores = openSeasonStore(season, outputDir, playByPlay)
+    scheduler = RetryScheduler(maxWorkers)
+
+    if bulkSchedule and not playByPlay:
+        seasonRecords = getSeasonRecords(season, scheduler, True, seasonStore.completed)
+    else:
+        gameList = [gameId for gameId in getGameIds(season, True) if not isStored(seasonStore, raggedStores, gameId)]
+        seasonRecords = getBaseGameRecordsConcurrent(gameList, scheduler, playByPlay)
+
+    gamesTotal = len(seasonRecords) if bulkSchedule and not playByPlay else len(gameList)
+
+    print(str(datetime.datetime.now()) + ': Fetching ' + str(gamesTotal) + ' games from ' + str(season))
+
+    for gamesDone, gameRecords in enumerate(seasonRecords, 1):
+        seasonStore.append(gameRecords)
+        reportProgress(season, gamesDone, gamesTotal)
+
+    seasonStore.flush()
+
+    for raggedStore in raggedStores.values():
+        raggedStore.compact()
+
+    scheduler.reportFailures('games from ' + str(season))
+
+
+# Job queue (see ScraperTools/JobQueue.py and scrapeJobs in ScraperTools/Orchestrator.py), one job per game feed
+
+
+def enqueueSeasons(jobQueue, seasonList, outputDir, playByPlay=False):
+    # Only finished games are queued, as in scrapeSeason
+    for season in seasonList:
+        seasonStore, raggedStores = openSeasonStore(season, outputDir, playByPlay)
+        jobQueue.enqueue('nhl', season, ((gameId, getFeedUrl(gameId), None) for gameId in getGameIds(season, True)
+                                         if not isStored(seasonStore, raggedStores, gameId)))
 
-            if homeGoals > awayGoals:
-                baseInformation['game.winner'] = ['home'] * 2
-            elif homeGoals == awayGoals:
-                baseInformation['game.winner'] = ['tie'] * 2
-            else:
-                baseInformation['game.winner'] = ['away'] * 2
-        else:
-            baseInformation['game.winner'] = ['tie'] * 2
-            baseInformation['goals'] = [min(homeGoals, awayGoals)] * 2
-            baseInformation['game.ot.winner'] = ['home'] * 2 if homeGoals > awayGoals else ['away'] * 2
 
-        baseInformation['home'] = [1, 0]
-        baseInformation['away'] = [0, 1]
+def handleJobs(jobs, maxWorkers=8, playByPlay=False):
+    scheduler = RetryScheduler(maxWorkers)
+    jobs = sorted(jobs, key=lambda job: job.key)
 
-        # Conference and divisions only make sense post-2013
-        baseInformation['conference.id'] = [str(nhlDict['gameData']['teams']['home']['conference']['id']),
-                                            str(nhlDict['gameData']['teams']['away']['conference']['id'])]
+    for job, gameRecords in zip(jobs, getBaseGameRecordsConcurrent([job.key for job in jobs], scheduler, playByPlay)):
+        yield job, gameRecords if gameRecords else None, scheduler.failed.get(job.key)
 
-        baseInformation['division.id'] = [str(nhlDict['gameData']['teams']['home']['division']['id']),
-                                          str(nhlDict['gameData']['teams']['away']['division']['id'])]
 
-        baseInformation['team.id'] = [str(nhlDict['gameData']['teams']['home']['id']),
-                                      str(nhlDict['gameData']['teams']['away']['id'])]
+def exportSeason(jobQueue, season, outputDir, playByPlay=False):
+    # Appends every finished game not yet in the season's store, in gamePk order
+    seasonStore, raggedStores = openSeasonStore(season, outputDir, playByPlay)
 
-        # Montreal Canadiens team name is not properly parsed
-        baseInformation['team.name'] = [nhlDict['gameData']['teams']['home']['name'] if baseInformation.loc[0, 'team.id'] != '8' else 'Montreal Canadiens',
-                                        nhlDict['gameData']['teams']['away']['name'] if baseInformation.loc[1, 'team.id'] != '8' else 'Montreal Canadiens']
+    for gameId, gameRecords in jobQueue.results('nhl', season):
+        if not isStored(seasonStore, raggedStores, gameId):
+            seasonStore.append(gameRecords)
 
-        baseInformation.index = [[gameId] * 2, ['home', 'away']]
+    seasonStore.flush()
 
-    return baseInformation
+    for raggedStore in raggedStores.values():
+        raggedStore.compact()
@@ -1,9 +1,11 @@
 from Backtesting.NHLAPIScraper.APIScraper import *
+from Backtesting.ScraperTools.Orchestrator import scrapeJobs, scrapeSeasons
+import functools
 
 
 '''
 Author: Jonathan Chow
-Date Modified: 2018-04-09
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Code to extract features from statsapi.web.nhl.com/api/. Explanations for column header meanings can be found at
@@ -18,16 +20,51 @@ if __name__ == '__main__':
     # seasonList = [2002, 2003, 2005, 2006, 2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018]
     seasonList = [2013, 2014, 2015, 2016, 2017, 2018]
 
-    for season in seasonList:
-        gameList = getGameIds(season)
-        gameData = pd.DataFrame()
+    # Seasons scraped at once (one process each) and maximum number of requests in flight per season
+    processes = 3
+    maxWorkers = 8
 
-        for gameId in gameList:
-            gameData = pd.concat([gameData, getBaseGameInformation(gameId)], sort=True, ignore_index=False)
+    # Combined limit over all processes as (requests per second, burst)
+    hostRates = {'statsapi.web.nhl.com': (10, 20)}
 
-        with open('HistoricalGameData_WithOT/Season' + str(season) + '.csv', mode='w+') as dataFile:
-            gameData.to_csv(dataFile, encoding='utf-8', index=True)
+    # Responses are cached in cacheDir (None to disable), except schedules and feeds of unfinished games. With replayOnly,
+    # nothing is fetched from the API
+    cacheDir = 'ResponseCache/'
+    replayOnly = False
 
-        print(str(datetime.datetime.now()) + ': Finished ' + str(season))
+    # Build each season from the expanded schedule, only reading game feeds for games missing inline data
+    bulkSchedule = True
+
+    # Also store every play (period, clock, event, team, coordinates, score) in Season{N}_Plays. Needs one feed per game
+    playByPlay = False
+
+    # Queue every game in a SQLite job table instead, shared by all processes. A killed run resumes from the table
+    jobQueuePath = None
+
+    outputDir = 'HistoricalGameData_WithOT/'
+
+    # Request latencies, status codes, retries and games per second, in Prometheus text format (None to only print a
+    # summary at the end)
+    metricsPath = 'NHLAPIScraper.prom'
+
+    if jobQueuePath is not None:
+        scrapeJobs(jobQueuePath, 'nhl', seasonList,
+                   functools.partial(enqueueSeasons, outputDir=outputDir, playByPlay=playByPlay),
+                   functools.partial(handleJobs, maxWorkers=maxWorkers, playByPlay=playByPlay),
+                   functools.partial(exportSeason, outputDir=outputDir, playByPlay=playByPlay),
+                   processes=processes,
+                   hostRates=hostRates,
+                   initializer=setResponseCache,
+                   initArgs=(cacheDir, replayOnly),
+                   metricsPath=metricsPath)
+    else:
+        scrapeSeasons(seasonList,
+                      functools.partial(scrapeSeason, outputDir=outputDir, maxWorkers=maxWorkers,
+                                        bulkSchedule=bulkSchedule, playByPlay=playByPlay),
+                      processes=processes,
+                      hostRates=hostRates,
+                      initializer=setResponseCache,
+                      initArgs=(cacheDir, replayOnly),
+                      metricsPath=metricsPath)
 
     print(str(datetime.datetime.now()) + ': Finished')
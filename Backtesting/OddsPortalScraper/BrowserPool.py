@@ -0,0 +1,101 @@
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+import concurrent.futures
+import datetime
+import functools
+import queue
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Pool of browser sessions that NHLScraper spreads its results pages and match pages over, one thread per session.
+Sessions are opened by open_session when a thread first needs one (NHLScraper.open_session loads the entry page and
+changes the odds format, so that is done once per session) and handed back to the pool between pages.
+
+A page that fails in a session that is still alive is the caller's to retry. When the session itself has gone (Firefox
+or geckodriver crashed, so every command fails), it is quit and replaced with a new one and the page is tried again in
+it, up to maxRestarts times per page.
+'''
+
+
+def session_alive(browser):
+    try:
+        browser.current_url
+        return True
+    except Exception:
+        return False
+
+
+def close_session(browser):
+    # Quits a session, which may have crashed already
+    try:
+        browser.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool(object):
+    def __init__(self, size, open_session, maxRestarts=2):
+        self.size = size
+        self.open_session = open_session
+        self.maxRestarts = maxRestarts
+        self.idle = queue.Queue()
+        self.executor = None
+
+    def lease(self):
+        # Every thread holds at most one session, so no more than size are ever open
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.open_session()
+
+    def run(self, fn, item):
+        # fn(browser, item) in a leased session, None if the session crashed on every try
+        browser = self.lease()
+        restarts = 0
+
+        try:
+            while True:
+                if browser is not None:
+                    try:
+                        return fn(browser, item)
+                    except Exception:
+                        if session_alive(browser):
+                            raise
+
+                    close_session(browser)
+                    browser = None
+
+                if restarts >= self.maxRestarts:
+                    print(str(datetime.datetime.now()) + ': Browser crashed ' + str(restarts + 1) + ' times on one page, '
+                          'giving up on it')
+                    return None
+
+                restarts += 1
+                getTelemetry().increment('scraper_browser_restarts_total', {})
+
+                try:
+                    browser = self.open_session()
+                except Exception:
+                    # A session that fails to open counts as another crash
+                    browser = None
+        finally:
+            if browser is not None:
+                self.idle.put(browser)
+
+    def map(self, fn, items):
+        # Iterator over the results in the order of items, each yielded as soon as it and those before it are done
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(self.size)
+
+        return self.executor.map(functools.partial(self.run, fn), items)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+        while not self.idle.empty():
+            close_session(self.idle.get_nowait())
@@ -0,0 +1,100 @@
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+import threading
+import time
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Paces NHLScraper's page loads and times its retries, in place of fixed sleeps. It keeps moving averages of how long a
+page takes to be ready (its elements found and read) and of the share of page loads that fail, and sets from them:
+ - the pause before each page load. Every failure doubles it (to at least one page ready time), and while the error
+   rate is below errorThreshold every success takes a tenth of a page ready time off it, so the crawl slows down when
+   the site starts failing and goes back to no pause at all once it answers again
+ - how long to wait for an element before giving up on a page, timeoutFactor page ready times between minTimeout and
+   maxTimeout rather than a flat 15s
+ - the backoff before retrying a failed page, doubling with every attempt from baseBackoff and never shorter than the
+   pause between pages
+
+Page ready times are recorded in Telemetry as scraper_page_duration_seconds (work) and pauses as
+scraper_wait_seconds_total by reason (waiting), so the summary shows how the crawl's time was split.
+
+A pool of browsers (see BrowserPool.py) shares one controller, so the pause is kept between page loads from any of them.
+'''
+
+
+class CrawlController(object):
+    def __init__(self, maxAttempts=4, baseBackoff=5.0, maxBackoff=300.0, maxPause=60.0, minTimeout=3.0,
+                 maxTimeout=15.0, timeoutFactor=5.0, errorThreshold=0.1, smoothing=0.2):
+        self.maxAttempts = maxAttempts
+        self.baseBackoff = baseBackoff
+        self.maxBackoff = maxBackoff
+        self.maxPause = maxPause
+        self.minTimeout = minTimeout
+        self.maxTimeout = maxTimeout
+        self.timeoutFactor = timeoutFactor
+        self.errorThreshold = errorThreshold
+        self.smoothing = smoothing
+
+        # Moving averages, readySeconds is None until a page has loaded
+        self.readySeconds = None
+        self.errorRate = 0.0
+
+        self.pause = 0.0
+        self.lastLoad = None
+        self.lock = threading.Lock()
+
+    def wait(self, seconds, reason):
+        if seconds <= 0:
+            return
+
+        time.sleep(seconds)
+        getTelemetry().increment('scraper_wait_seconds_total', {'reason': reason}, seconds)
+
+    def before_load(self):
+        # Called before every page load, so loads start at least pause seconds apart. The slot is taken under the lock
+        # and waited for outside it, so threads queue up one pause apart
+        with self.lock:
+            now = time.monotonic()
+            start = now if self.lastLoad is None else max(now, self.lastLoad + self.pause)
+            self.lastLoad = start
+
+        self.wait(start - now, 'pacing')
+
+    def timeout(self):
+        if self.readySeconds is None:
+            return self.maxTimeout
+
+        return min(self.maxTimeout, max(self.minTimeout, self.timeoutFactor * self.readySeconds))
+
+    def succeeded(self, page, seconds):
+        with self.lock:
+            if self.readySeconds is None:
+                self.readySeconds = seconds
+            else:
+                self.readySeconds += self.smoothing * (seconds - self.readySeconds)
+
+            self.errorRate *= 1 - self.smoothing
+
+            if self.errorRate < self.errorThreshold:
+                self.pause = max(0.0, self.pause - self.readySeconds / 10)
+
+        getTelemetry().observe('scraper_page_duration_seconds', {'page': page}, seconds)
+
+    def failed(self, page, seconds, attempt):
+        # Waits out the backoff and returns True if the page should be tried again, False after maxAttempts
+        with self.lock:
+            self.errorRate += self.smoothing * (1 - self.errorRate)
+            self.pause = min(self.maxPause, max(2 * self.pause, self.readySeconds or 1.0))
+            pause = self.pause
+
+        getTelemetry().observe('scraper_page_duration_seconds', {'page': page + ' (failed)'}, seconds)
+
+        if attempt >= self.maxAttempts:
+            return False
+
+        self.wait(min(self.maxBackoff, max(pause, self.baseBackoff * 2 ** (attempt - 1))), 'backoff')
+
+        return True
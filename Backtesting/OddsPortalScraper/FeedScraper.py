@@ -0,0 +1,251 @@
+from Backtesting.OddsPortalScraper.NHLScraper import NHLScraper, parse_max_page
+from Backtesting.ScraperTools.RetryScheduler import RetryScheduler
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+from bs4 import BeautifulSoup
+import collections
+import datetime
+import json
+import re
+import urllib.parse
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+NHLScraper without a browser. Rather than rendering pages in Firefox, FeedScraper requests the data the pages load
+themselves, through ScraperTools/HTTPClient.py and on a RetryScheduler's thread pool:
+ - a season's results come from the tournament archive feed (the id is in the season page's PageTournament script),
+   which holds the same tournamentTable and pagination the browser reads
+ - each match page is fetched as plain HTML for its PageEvent script (event id and feed hash), its start time and the
+   bookmaker names file it links to
+ - the odds come from the match's 1X2 full time feed, keyed by bookmaker id
+
+Records have the keys NHLScraper.complete_link writes and go through the same SeasonSink, so the two can resume each
+other's runs. Start times are converted to the local time zone, as the browser shows them. The odds feed also lists
+each bookmaker's earlier odds, which are kept as the game's line movement under one more key, 'history', that browser
+records do not have. Season{N}.json can mix both kinds of record: OddsStore.py reads only the keys the browser writes
+and OddsHistory.py takes a record without 'history' to have only its closing odds.
+
+The bookmaker names come from a file the match pages link to. It is read from the first match page that links one, and
+tried again from later pages if that fails, up to bookmakerAttempts times. A season whose match pages never give the
+names stops with BookmakersMissingError, as none of its odds could be named.
+'''
+
+
+class BookmakersMissingError(LookupError):
+    pass
+
+
+# Feeds are JSONP, globals.jsonpCallback('<path>', {...});
+def parse_feed(webText):
+    return json.loads(webText[webText.index('{'):webText.rindex('}') + 1])
+
+
+def parse_event(html):
+    # The feed parameters and start time from a match page, None if they are missing
+    event = re.search(r'new PageEvent\((\{.*?\})\)', html)
+    start = re.search(r'class="date datet t([0-9]+)-', html)
+    bookies = re.search(r'/res/x/bookies-[^"\']+\.js', html)
+
+    if event is None or start is None:
+        return None
+
+    event = json.loads(event.group(1))
+
+    return {'id': event['id'],
+            'xhash': urllib.parse.unquote(event['xhash']),
+            'start': int(start.group(1)),
+            'bookies': bookies.group(0) if bookies else None}
+
+
+def outcome_values(values):
+    # Per outcome values (home, tie, away) come either as a list or as a dict keyed '0', '1', '2'
+    return values if isinstance(values, list) else [values[str(i)] for i in range(3)]
+
+
+def parse_movement(feed_history, outcome_id, bookmaker_id, odds, change_time, start):
+    # [[seconds from the start, odds]] for one bookmaker and outcome, oldest first and ending with the current odds.
+    # The feed lists earlier odds newest first as [odds, change, time]
+    earlier = feed_history.get(outcome_id, {}).get(bookmaker_id, [])
+    movement = [[moved - start, float(earlier_odds)] for earlier_odds, _, moved in earlier]
+    movement.append([(change_time if change_time is not None else start) - start, float(odds)])
+
+    return sorted(movement, key=lambda snapshot: snapshot[0])
+
+
+def parse_feed_match(partial, feed, bookmakers, start):
+    # Completes a game's partial record from its odds feed. bookmakers maps bookmaker ids to names, start is the epoch
+    # start time. When the feed has the odds history it goes in record['history'] (see ScraperTools/OddsHistory.py)
+    record = dict(partial)
+    outcome = feed['d']['oddsdata']['back']['E-1-2-0-0-0']
+    active = outcome.get('act', {})
+    feed_history = feed['d'].get('history', {}).get('back')
+    outcome_ids = outcome_values(outcome.get('OutcomeID', [None] * 3))
+    startTime = datetime.datetime.fromtimestamp(start)
+
+    record['odds'] = {}
+    history = {}
+
+    for bookmaker_id, odds in outcome['odds'].items():
+        # Bookmakers the page would not show
+        if bookmaker_id not in bookmakers or not active.get(bookmaker_id, True):
+            continue
+
+        odds = outcome_values(odds)
+        bookmaker = bookmakers[bookmaker_id]
+        record['odds'][bookmaker] = {}
+        record['odds'][bookmaker]['home.odds'] = float(odds[0])
+        record['odds'][bookmaker]['tie.odds'] = float(odds[1])
+        record['odds'][bookmaker]['away.odds'] = float(odds[2])
+
+        if feed_history is not None:
+            change_times = outcome_values(outcome.get('change_time', {}).get(bookmaker_id, [None] * 3))
+            history[bookmaker] = {column: parse_movement(feed_history, outcome_ids[i], bookmaker_id, odds[i],
+                                                         change_times[i], start)
+                                  for i, column in enumerate(['home.odds', 'tie.odds', 'away.odds'])}
+
+    record['day'] = startTime.strftime('%d %b %Y')
+    record['time'] = startTime.strftime('%H:%M')
+
+    if feed_history is not None:
+        record['history'] = history
+
+    return record
+
+
+class FeedScraper(NHLScraper):
+    def __init__(self, seasonsToScrape, outputLoc, root_url='https://www.oddsportal.com',
+                 feed_url='https://fb.oddsportal.com', scheduler=None, parser=None, bookmakerAttempts=3):
+        super().__init__(seasonsToScrape, outputLoc, root_url, parser=parser)
+        self.feed_url = feed_url
+        self.scheduler = scheduler if scheduler is not None else RetryScheduler()
+        # Bookmaker id to name, read from the first match page's bookmakers file that loads
+        self.bookmakers = None
+        self.bookmakerAttempts = bookmakerAttempts
+        self.bookmakerPaths = []
+
+    def scrape(self):
+        self.extract_from_urls(self.get_url_list())
+        self.scheduler.reportFailures('OddsPortal pages')
+
+    def setup(self, browser=None):
+        # Feed odds are always decimal, so there is nothing to change
+        pass
+
+    def fetch(self, url):
+        # A single page or feed, None if it could not be fetched
+        for _, webText in self.scheduler.fetchAll([(url, url)]):
+            return webText
+
+    def get_url_list(self):
+        html = self.fetch(self.entry_url)
+
+        if html is None:
+            return []
+
+        filters = BeautifulSoup(html, "html.parser").find_all(class_='main-filter')
+
+        return self.parse_season_urls(filters[1].decode_contents())
+
+    def results_feed_url(self, tournament, page):
+        return '{0}/ajax-sport-country-tournament-archive/{1}/{2}/X0/1/0/{3}/'.format(self.feed_url, tournament['sid'],
+                                                                                      tournament['id'], page)
+
+    def match_feed_url(self, event):
+        return '{0}/feed/match/1-4-{1}-1-2-{2}.dat'.format(self.feed_url, event['id'], event['xhash'])
+
+    def list_url(self, url):
+        # Links to every game of a season, with their partial records left in partial_store
+        html = self.fetch(url)
+        tournament = re.search(r'new PageTournament\((\{.*?\})\)', html) if html is not None else None
+
+        if tournament is None:
+            print('No results feed for: ' + url)
+            return []
+
+        tournament = json.loads(tournament.group(1))
+        first = self.fetch(self.results_feed_url(tournament, 1))
+
+        if first is None:
+            return []
+
+        first = parse_feed(first)['d']['html']
+        pagination = re.search(r'<div id="pagination">(.*?)</div>', first, re.DOTALL)
+        max_page = parse_max_page(pagination.group(1)) if pagination else 1
+
+        pages = [first] + [parse_feed(webText)['d']['html'] for _, webText in self.scheduler.fetchAll(
+            (page, self.results_feed_url(tournament, page)) for page in range(2, max_page + 1)) if webText is not None]
+
+        links = []
+
+        for page in pages:
+            table = re.search(r'<table[^>]*id="tournamentTable"[^>]*>(.*?)</table>', page, re.DOTALL)
+
+            if table is not None:
+                links += self.parse_results_page(table.group(1))
+
+        return links
+
+    def extract_from_url(self, url):
+        self.complete_links(list(dict.fromkeys(self.list_url(url))))
+
+    def load_bookmakers(self, path):
+        self.bookmakerPaths.append(path)
+        webText = self.fetch(self.relative_path(path))
+        search = re.search(r'bookmakersData=(\{.*?\});', webText or '')
+
+        if search is None:
+            print('Unable to read bookmakers from: ' + path)
+            return
+
+        bookmakers = json.loads(search.group(1))
+        self.bookmakers = {bookmaker_id: bookmaker['WebName'] for bookmaker_id, bookmaker in bookmakers.items()}
+
+    def complete_links(self, links):
+        # Fetches the match pages, then the odds feeds, both concurrently. Records are stored in the order the games
+        # were listed
+        telemetry = getTelemetry()
+        events = collections.OrderedDict()
+
+        for link in links:
+            # Saved by an earlier run
+            if self.sink is not None and link in self.sink:
+                self.partial_store.pop(link)
+
+        matches = [(link, link) for link in links if link in self.partial_store]
+
+        for link, html in self.scheduler.fetchAll(matches):
+            event = parse_event(html) if html is not None else None
+
+            if event is None:
+                self.partial_store.pop(link)
+                print('Unable to extract odds from: ' + link)
+                continue
+
+            if self.bookmakers is None and event['bookies'] is not None and \
+                    len(self.bookmakerPaths) < self.bookmakerAttempts:
+                self.load_bookmakers(event['bookies'])
+
+            events[link] = event
+
+        if events and self.bookmakers is None:
+            tried = ', '.join(dict.fromkeys(self.bookmakerPaths)) or 'none'
+            raise BookmakersMissingError('Unable to read bookmaker names from any of ' + str(len(events)) +
+                                         ' match pages (tried ' + tried + ')')
+
+        feeds = [(link, self.match_feed_url(event)) for link, event in events.items()]
+
+        for link, webText in self.scheduler.fetchAll(feeds):
+            partial = self.partial_store.pop(link)
+
+            try:
+                record = parse_feed_match(partial, parse_feed(webText), self.bookmakers, events[link]['start'])
+            except (KeyError, ValueError, AttributeError):
+                print('Unable to extract odds from: ' + link)
+                continue
+
+            print(record)
+            self.store_record(link, record)
+            telemetry.increment('scraper_games_total', {'source': 'oddsportal'})
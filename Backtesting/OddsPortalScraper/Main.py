@@ -1,21 +1,82 @@
-from Backtesting.OddsPortalScraper.NHLScraper import NHLScraper
-import datetime
-
-
-'''
-Author: Jonathan Chow & Alex Foley
-Date Modified: 2019-08-14
-Python Version: 3.7
-'''
-
-
-if __name__ == '__main__':
-    print(str(datetime.datetime.now()) + ': Started')
-
-    seasonList = [2002, 2003, 2005, 2006, 2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018]
-
-    n = NHLScraper(seasonsToScrape=seasonList,
-                   outputLoc='HistoricalOdds/')
-    n.scrape()
-
-    print(str(datetime.datetime.now()) + ': Finished')
+from Backtesting.OddsPortalScraper.FeedScraper import FeedScraper
+from Backtesting.OddsPortalScraper.NHLScraper import NHLScraper, enqueue_seasons, export_season, handle_jobs, parse_archive
+from Backtesting.OddsPortalScraper.SnapshotArchive import SnapshotArchive
+from Backtesting.ScraperTools.Orchestrator import scrapeJobs
+from Backtesting.ScraperTools.RetryScheduler import RetryScheduler
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+import datetime
+import functools
+
+
+'''
+Author: Jonathan Chow & Alex Foley
+Date Modified: 2026-10-17
+Python Version: 3.7
+'''
+
+
+if __name__ == '__main__':
+    print(str(datetime.datetime.now()) + ': Started')
+
+    seasonList = [2002, 2003, 2005, 2006, 2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018]
+
+    # Queue every game in a SQLite job table and complete them with several browsers at once (one per process). A
+    # killed run resumes from the table
+    jobQueuePath = None
+    processes = 3
+
+    # Save the raw HTML of every page to archiveDir instead of parsing while crawling. Season files are then built from
+    # the archive on parseProcesses processes. With parseOnly nothing is crawled, the season files are rebuilt from the
+    # archive (e.g. after a parser fix)
+    archiveDir = None
+    parseOnly = False
+    parseProcesses = 4
+
+    # Read the odds from the data feeds the pages load, over plain HTTP on feedWorkers threads, instead of driving
+    # Firefox (see FeedScraper.py). Needs no browser or geckodriver
+    useFeeds = False
+    feedWorkers = 8
+
+    # Spread each season's results pages and games over browserSessions Firefox sessions (see BrowserPool.py), run
+    # without windows when headless
+    browserSessions = 4
+    headless = True
+
+    # Page load times, waits between pages and games per second, in Prometheus text format (None to only print a summary
+    # at the end)
+    metricsPath = 'OddsPortalScraper.prom'
+
+    if parseOnly:
+        parse_archive(archiveDir, seasonList, 'HistoricalOdds/', processes=parseProcesses)
+    elif jobQueuePath is not None:
+        scrapeJobs(jobQueuePath, 'oddsportal', seasonList,
+                   functools.partial(enqueue_seasons, output_loc='HistoricalOdds/', archive_dir=archiveDir),
+                   functools.partial(handle_jobs, archive_dir=archiveDir),
+                   functools.partial(export_season, output_loc='HistoricalOdds/', archive_dir=archiveDir,
+                                     processes=parseProcesses),
+                   processes=processes,
+                   batchSize=20,
+                   leaseSeconds=3600,
+                   metricsPath=metricsPath)
+    else:
+        if useFeeds:
+            n = FeedScraper(seasonsToScrape=seasonList,
+                            outputLoc='HistoricalOdds/',
+                            scheduler=RetryScheduler(feedWorkers))
+        else:
+            n = NHLScraper(seasonsToScrape=seasonList,
+                           outputLoc='HistoricalOdds/',
+                           archive=SnapshotArchive(archiveDir) if archiveDir is not None else None,
+                           sessions=browserSessions,
+                           headless=headless)
+        n.scrape()
+
+        if archiveDir is not None and not useFeeds:
+            parse_archive(archiveDir, seasonList, 'HistoricalOdds/', processes=parseProcesses)
+
+        if metricsPath is not None:
+            getTelemetry().writePrometheus(metricsPath)
+
+        getTelemetry().printSummary()
+
+    print(str(datetime.datetime.now()) + ': Finished')
@@ -1,172 +1,548 @@
-from Backtesting.OddsPortalScraper.Scraper import Scraper
-from bs4 import BeautifulSoup
-import json
-import re
-import time
-
-
-'''
-Author: Jonathan Chow & Alex Foley
-Date Modified: 2019-08-14
-Python Version: 3.7
-'''
-
-
-def format_page_string(page_num):
-    return '#/' if page_num == 1 else '#/page/{0}/'.format(page_num)
-
-
-def extract_page_num(string):
-    search = re.search('#/page/([^/]*)/?', string)
-    return int(search.group(1)) if search else 1
-
-
-class NHLScraper(Scraper):
-    def __init__(self, seasonsToScrape, outputLoc):
-        self.partial_store = {}
-        self.reset_state()
-        self.seasonsToScrape = seasonsToScrape
-        self.outputLoc = outputLoc
-        super().__init__('https://www.oddsportal.com/hockey/usa/nhl/results/', 'https://www.oddsportal.com')
-
-
-    def reset_state(self):
-        self.state = {
-            'pre-season': False,
-            'regular-season': True,
-            'playoffs': False,
-            'day': None
-        }
-    
-    def setup(self):
-        print('Setting up NHL scraper -- changing odds format')
-        self.browser.execute_script('changeOddsFormat(1)')  # Change to decimal odds
-        time.sleep(10)
-
-    # String is in the format date (- (pre-season|playoffs))?
-    def update_state_from_string(self, string):
-        if "-" in string:
-            if "season" in string:
-                self.state['pre-season'] = True
-                self.state['regular-season'] = False
-                self.state['playoffs'] = False
-            else:
-                self.state['pre-season'] = False
-                self.state['regular-season'] = False
-                self.state['playoffs'] = True
-
-        else:
-            self.state['pre-season'] = False
-            self.state['regular-season'] = True
-            self.state['playoffs'] = False
-
-    def getUrlSeason(self, url):
-        try:
-            return int(re.search('nhl-([0-9]{4})-', url).group(1))
-        except AttributeError:
-            # What can you do
-            return -1
-
-    def get_url_list(self):
-        html = self.browser.find_elements_by_class_name('main-filter')[1].get_attribute('innerHTML')
-        soup = BeautifulSoup(html, "html.parser")
-
-        urls = [self.relative_path(a['href']) for a in soup.find_all("a", href=True) if a['href'] != "/hockey/usa/nhl/results/"]
-        urls = [url for url in urls if self.getUrlSeason(url) in self.seasonsToScrape]
-
-        return urls
-
-    def extract_from_urls(self, urls):
-        for url in urls:
-            print("Starting extraction for: {0}".format(url))
-            self.reset_state()
-            self.extract_from_url(url)
-            print("Finished extraction for: {0}".format(url))
-            print("Writing results to store...")
-            self.dump_to_store(self.getUrlSeason(url))
-            print("Writing complete")
-
-    def extract_from_url(self, url):
-        self.browser.get(url)
-
-        try:
-            soup = BeautifulSoup(self.get_lazy_element_by_id("pagination").get_attribute('innerHTML'), "html.parser")
-            max_page = extract_page_num(soup.find_all("a")[-1]['href'])
-        except:
-            # what can you do ¯\_(ツ)_/¯
-            return 
-
-        for i in range(1, max_page + 1):
-            path = self.relative_path(format_page_string(i), url)
-            self.browser.get(path)
-            self.extract_from_page()
-
-    def extract_from_page(self):
-        html = self.get_lazy_element_by_id("tournamentTable").get_attribute('innerHTML')
-        soup = BeautifulSoup(html, "html.parser")
-        rows = soup.find_all("tr")[1:]
-        links_to_follow = []
-        for row in rows:
-            if 'table-dummyrow' in row['class']:
-                continue
-            if len(row.contents) == 5:
-                # update state
-                self.update_state_from_string(row.find('th').get_text())
-            else:
-                # found game
-                _, teams = [t for t in row.find_all("td")[:2]]
-                link = self.relative_path(teams.find("a")['href'])
-                teams = teams.get_text()
-                home, away = [s.strip() for s in teams.split(" - ")]
-
-                self.partial_store[link] = {}
-                for key in self.state:
-                    self.partial_store[link][key] = self.state[key]
-                self.partial_store[link]['home'] = home
-                self.partial_store[link]['away'] = away
-
-                links_to_follow.append(link)
-
-        for link in links_to_follow:
-            self.complete_link(link, 0)
-
-    def complete_link(self, link, attempts):
-        try:
-            self.browser.get(link)
-            partial = self.partial_store.pop(link)
-            html = self.get_lazy_element_by_id('odds-data-table').get_attribute("innerHTML")
-            soup = BeautifulSoup(html, "html.parser")
-
-            _, day, gameTime = [s.strip() for s in self.browser.find_element_by_class_name("date").get_attribute("innerHTML").split(",")]
-
-            oddsTable = soup.find("table", {"class": "table-main detail-odds sortable"}).find('tbody')
-
-            partial['odds'] = {}
-
-            for row in oddsTable.find_all('tr'):
-                cols = row.find_all("td")
-
-                if not cols:
-                    break
-
-                bookmaker = cols[0].find('a', {'class': 'name'}).get_text()
-
-                partial['odds'][bookmaker] = {}
-                partial['odds'][bookmaker]['home.odds'] = float(cols[1].get_text())
-                partial['odds'][bookmaker]['tie.odds'] = float(cols[2].get_text())
-                partial['odds'][bookmaker]['away.odds'] = float(cols[3].get_text())
-
-            partial['day'] = day
-            partial['time'] = gameTime
-            print(partial)
-            self.store.append(partial)
-        except:
-            if attempts == 0:
-                time.sleep(300)
-                self.complete_link(link, attempts + 1)
-            else:
-                print('Unable to extract odds from: ' + link)
-
-    def dump_to_store(self, season):
-        with open(self.outputLoc + 'Season' + str(season) + '.json', 'w+') as fp:
-            json.dump(self.store, fp)
+from Backtesting.OddsPortalScraper.BrowserPool import BrowserPool, close_session, session_alive
+from Backtesting.OddsPortalScraper.CrawlController import CrawlController
+from Backtesting.OddsPortalScraper.PageParser import get_parser
+from Backtesting.OddsPortalScraper.Scraper import Scraper
+from Backtesting.OddsPortalScraper.SeasonSink import SeasonSink
+from Backtesting.OddsPortalScraper.SnapshotArchive import SnapshotArchive
+from Backtesting.ScraperTools.OddsStore import ingestSeason
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+from bs4 import BeautifulSoup
+import datetime
+import json
+import multiprocessing
+import re
+import time
+
+
+'''
+Author: Jonathan Chow & Alex Foley
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Games are appended to a per-season lines file as they are scraped and Season{N}.json is written from it once the season
+is done (see SeasonSink.py), so a rerun skips games already scraped. Every Season{N}.json written is also ingested into
+the columnar odds store the backtests read (Season{N}.parquet, see ScraperTools/OddsStore.py).
+
+Page loads are paced, and failed pages retried, by a CrawlController (see CrawlController.py), which waits on the
+elements a page needs rather than for fixed times and slows the crawl down when pages start failing.
+
+With sessions above 1, a season's results pages and then its games are spread over a pool of that many browser
+sessions (see BrowserPool.py), next to the one that reads the season list. Pages are parsed and games stored on the
+main thread in the order they were listed, so the output is the same as with a single browser. A crashed browser is
+replaced with a new session in either case.
+
+With an archive (see SnapshotArchive.py) the crawler saves the raw HTML of every page it reads instead of parsing match
+pages, and parse_archive builds the season files from the archive afterwards, parsing matches on a process pool.
+'''
+
+
+def format_page_string(page_num):
+    return '#/' if page_num == 1 else '#/page/{0}/'.format(page_num)
+
+
+def extract_page_num(string):
+    search = re.search('#/page/([^/]*)/?', string)
+    return int(search.group(1)) if search else 1
+
+
+def parse_max_page(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return extract_page_num(soup.find_all("a")[-1]['href'])
+
+
+def parse_match(partial, odds_html, date_html, parser):
+    # Completes a game's partial record (from its results page) with the odds and date on its match page. parser is
+    # from PageParser.get_parser
+    record = dict(partial)
+
+    _, day, gameTime = [s.strip() for s in date_html.split(",")]
+
+    record['odds'] = {}
+
+    for bookmaker, home_odds, tie_odds, away_odds in parser.odds_rows(odds_html):
+        record['odds'][bookmaker] = {}
+        record['odds'][bookmaker]['home.odds'] = home_odds
+        record['odds'][bookmaker]['tie.odds'] = tie_odds
+        record['odds'][bookmaker]['away.odds'] = away_odds
+
+    record['day'] = day
+    record['time'] = gameTime
+
+    return record
+
+
+class NHLScraper(Scraper):
+    def __init__(self, seasonsToScrape, outputLoc, root_url='https://www.oddsportal.com', archive=None, parser=None,
+                 controller=None, sessions=1, headless=False, maxRestarts=2):
+        self.partial_store = {}
+        self.reset_state()
+        self.seasonsToScrape = seasonsToScrape
+        self.outputLoc = outputLoc
+        self.archive = archive
+        # Set for the season being scraped by extract_from_urls, games go to store when there is none
+        self.sink = None
+        # 'lxml' or 'soup' (see PageParser.py), None for the fastest available
+        self.parser = get_parser(parser)
+        self.controller = controller if controller is not None else CrawlController()
+        self.maxRestarts = maxRestarts
+        self.pool = BrowserPool(sessions, self.open_session, maxRestarts) if sessions > 1 else None
+        # root_url can point at a stand-in server (see ScraperBenchmark)
+        super().__init__(root_url + '/hockey/usa/nhl/results/', root_url, headless=headless)
+
+
+    def reset_state(self):
+        self.state = {
+            'pre-season': False,
+            'regular-season': True,
+            'playoffs': False,
+            'day': None
+        }
+    
+    def scrape(self):
+        try:
+            super().scrape()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+
+    def setup(self, browser=None):
+        print('Setting up NHL scraper -- changing odds format')
+        browser = browser or self.browser
+        started = time.monotonic()
+        page = browser.find_element_by_tag_name('html')
+        browser.execute_script('changeOddsFormat(1)')  # Change to decimal odds, which reloads the page
+        self.wait_for_reload(page, self.controller.maxTimeout, browser=browser)
+        getTelemetry().observe('scraper_page_duration_seconds', {'page': 'setup'}, time.monotonic() - started)
+
+    def open_session(self):
+        # A new browser on the entry page with decimal odds, for the pool or to replace a crashed one
+        browser = self.new_browser()
+
+        try:
+            browser.get(self.entry_url)
+            self.setup(browser)
+        except Exception:
+            close_session(browser)
+            raise
+
+        return browser
+
+    def restart_browser(self):
+        close_session(self._browser)
+        self._browser = None
+        getTelemetry().increment('scraper_browser_restarts_total', {})
+        self._browser = self.open_session()
+
+    def load(self, url):
+        self.controller.before_load()
+        self.browser.get(url)
+
+    # String is in the format date (- (pre-season|playoffs))?
+    def update_state_from_string(self, string):
+        if "-" in string:
+            if "season" in string:
+                self.state['pre-season'] = True
+                self.state['regular-season'] = False
+                self.state['playoffs'] = False
+            else:
+                self.state['pre-season'] = False
+                self.state['regular-season'] = False
+                self.state['playoffs'] = True
+
+        else:
+            self.state['pre-season'] = False
+            self.state['regular-season'] = True
+            self.state['playoffs'] = False
+
+    def getUrlSeason(self, url):
+        try:
+            return int(re.search('nhl-([0-9]{4})-', url).group(1))
+        except AttributeError:
+            # What can you do
+            return -1
+
+    def archive_snapshot(self, url, fragments):
+        if self.archive is not None:
+            self.archive.put(url, fragments)
+
+    def get_url_list(self):
+        html = self.browser.find_elements_by_class_name('main-filter')[1].get_attribute('innerHTML')
+        self.archive_snapshot(self.entry_url, {'main-filter': html})
+
+        return self.parse_season_urls(html)
+
+    def parse_season_urls(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+
+        urls = [self.relative_path(a['href']) for a in soup.find_all("a", href=True) if a['href'] != "/hockey/usa/nhl/results/"]
+        urls = [url for url in urls if self.getUrlSeason(url) in self.seasonsToScrape]
+
+        return urls
+
+    def extract_from_urls(self, urls):
+        for url in urls:
+            print("Starting extraction for: {0}".format(url))
+            self.reset_state()
+            self.store = []
+
+            if self.archive is None:
+                self.sink = SeasonSink(self.outputLoc, self.getUrlSeason(url))
+                print("{0} games already scraped".format(len(self.sink)))
+
+            self.extract_from_url(url)
+            print("Finished extraction for: {0}".format(url))
+
+            if self.sink is not None:
+                print("Writing results to store...")
+                self.sink.export()
+                ingestSeason(self.getUrlSeason(url), self.outputLoc)
+                self.sink = None
+                print("Writing complete")
+
+    def page_count(self, url):
+        # Opens a season's results and reads the number of pages, 0 if there are none
+        self.load(url)
+
+        try:
+            html = self.get_lazy_element_by_id("pagination", self.controller.timeout()).get_attribute('innerHTML')
+            max_page = parse_max_page(html)
+        except:
+            # what can you do ¯\_(ツ)_/¯
+            return 0
+
+        self.archive_snapshot(url, {'pagination': html})
+
+        return max_page
+
+    def extract_from_url(self, url):
+        if self.pool is not None:
+            self.extract_pooled(url)
+            return
+
+        for i in range(1, self.page_count(url) + 1):
+            path = self.relative_path(format_page_string(i), url)
+            self.load(path)
+            self.extract_from_page(path)
+
+    def extract_pooled(self, url):
+        # The pool reads the results pages, then the games, and both are parsed and stored here in listing order. Each
+        # game is stored as soon as it is read, so a crash mid-season keeps every game before it
+        paths = [self.relative_path(format_page_string(i), url) for i in range(1, self.page_count(url) + 1)]
+        links = []
+
+        for path, html in zip(paths, self.pool.map(self.read_results_page, paths)):
+            if html is None:
+                print('Unable to read results from: ' + path)
+                continue
+
+            self.archive_snapshot(path, {'tournamentTable': html})
+            links += self.parse_results_page(html)
+
+        matches = []
+
+        for link in dict.fromkeys(links):
+            partial = self.partial_store.pop(link)
+
+            # Saved by an earlier run
+            if self.sink is not None and link in self.sink:
+                continue
+
+            if self.archive is not None and link in self.archive:
+                self.store.append(partial)
+                continue
+
+            matches.append((link, partial))
+
+        for (link, _), record in zip(matches, self.pool.map(self.read_match, matches)):
+            self.finish_match(link, record)
+
+    def read_results_page(self, browser, path):
+        # The tournamentTable of a results page, None if it could not be read
+        attempts = 0
+
+        while True:
+            attempts += 1
+            self.controller.before_load()
+            started = time.monotonic()
+
+            try:
+                browser.get(path)
+                # Only the fragment changes between pages, so reload to be sure the table is for this page
+                browser.refresh()
+                html = self.get_lazy_element_by_id('tournamentTable', self.controller.timeout(), browser=browser)\
+                    .get_attribute('innerHTML')
+                self.controller.succeeded('results', time.monotonic() - started)
+                return html
+            except Exception:
+                if not session_alive(browser):
+                    raise
+
+                if not self.controller.failed('results', time.monotonic() - started, attempts):
+                    return None
+
+    def extract_from_page(self, page_url):
+        for link in self.list_page(page_url):
+            self.complete_link(link, 0)
+
+    def list_page(self, page_url):
+        # Links to the games on the current results page, their partial records are left in partial_store
+        html = self.get_lazy_element_by_id("tournamentTable", self.controller.timeout()).get_attribute('innerHTML')
+        self.archive_snapshot(page_url, {'tournamentTable': html})
+
+        return self.parse_results_page(html)
+
+    def parse_results_page(self, html):
+        links_to_follow = []
+        for row in self.parser.results_rows(html):
+            if row[0] == 'stage':
+                # update state
+                self.update_state_from_string(row[1])
+            else:
+                # found game
+                _, href, teams = row
+                link = self.relative_path(href)
+                home, away = [s.strip() for s in teams.split(" - ")]
+
+                self.partial_store[link] = {}
+                for key in self.state:
+                    self.partial_store[link][key] = self.state[key]
+                self.partial_store[link]['home'] = home
+                self.partial_store[link]['away'] = away
+
+                links_to_follow.append(link)
+
+        return links_to_follow
+
+    def list_url(self, url):
+        # Links to every game of a season, without visiting them
+        links = []
+
+        for i in range(1, self.page_count(url) + 1):
+            path = self.relative_path(format_page_string(i), url)
+            self.load(path)
+            # Only the fragment changes between pages, so reload to be sure the table is for this page
+            self.browser.refresh()
+            links += self.list_page(path)
+
+        return links
+
+    def list_archived_url(self, archive, url):
+        # Same as list_url, reading the pages from an archive
+        snapshot = archive.get(url)
+
+        if snapshot is None:
+            return []
+
+        links = []
+
+        for i in range(1, parse_max_page(snapshot['pagination']) + 1):
+            path = self.relative_path(format_page_string(i), url)
+            page = archive.get(path)
+
+            if page is None:
+                print('No snapshot of: ' + path)
+                continue
+
+            links += self.parse_results_page(page['tournamentTable'])
+
+        return links
+
+    def complete_job(self, link, partial):
+        # Completes a single link whose partial record came from list_page, returning what was stored for it
+        self.partial_store[link] = partial
+        stored = len(self.store)
+        self.complete_link(link, 0)
+
+        return self.store[stored:]
+
+    def complete_link(self, link, attempts):
+        # attempts is the number of times the link has already been tried
+        # Saved by an earlier run
+        if self.sink is not None and link in self.sink:
+            self.partial_store.pop(link)
+            return
+
+        if self.archive is not None and link in self.archive:
+            self.store.append(self.partial_store.pop(link))
+            return
+
+        partial = self.partial_store.pop(link)
+        restarts = 0
+
+        while True:
+            try:
+                record = self.read_match(self.browser, (link, partial), attempts)
+                break
+            except Exception:
+                # read_match only gives up on the page when the browser has crashed
+                if restarts >= self.maxRestarts:
+                    record = None
+                    break
+
+                restarts += 1
+                self.restart_browser()
+
+        self.finish_match(link, record)
+
+    def read_match(self, browser, match, attempts=0):
+        # match is (link, partial record). Returns the completed record (only the partial one with an archive, where
+        # the match page is parsed later by parse_archive so the browser moves straight on to the next game), None if
+        # the page could not be read. Raises if the browser crashed
+        link, partial = match
+
+        while True:
+            attempts += 1
+            self.controller.before_load()
+            started = time.monotonic()
+
+            try:
+                browser.get(link)
+                table = self.get_lazy_element_by_id('odds-data-table', self.controller.timeout(), browser=browser)
+                html = table.get_attribute("innerHTML")
+                date = browser.find_element_by_class_name("date").get_attribute("innerHTML")
+
+                if self.archive is not None:
+                    self.archive.put(link, {'odds-data-table': html, 'date': date})
+                    record = partial
+                else:
+                    record = parse_match(partial, html, date, self.parser)
+
+                self.controller.succeeded('match', time.monotonic() - started)
+                return record
+            except Exception:
+                if not session_alive(browser):
+                    raise
+
+                if not self.controller.failed('match', time.monotonic() - started, attempts):
+                    return None
+
+    def finish_match(self, link, record):
+        if record is None:
+            print('Unable to extract odds from: ' + link)
+            return
+
+        if self.archive is None:
+            print(record)
+
+        self.store_record(link, record)
+        getTelemetry().increment('scraper_games_total', {'source': 'oddsportal'})
+
+    def store_record(self, link, record):
+        if self.sink is not None:
+            self.sink.append(link, record)
+        else:
+            self.store.append(record)
+
+
+# Job queue (see ScraperTools/JobQueue.py and scrapeJobs in ScraperTools/Orchestrator.py), one job per game link with
+# the game's partial record (home, away, season stage) as payload
+
+
+def open_archive(archive_dir):
+    return SnapshotArchive(archive_dir) if archive_dir is not None else None
+
+
+def enqueue_seasons(job_queue, seasons, output_loc, root_url='https://www.oddsportal.com', archive_dir=None):
+    scraper = NHLScraper(seasonsToScrape=seasons, outputLoc=output_loc, root_url=root_url, archive=open_archive(archive_dir))
+
+    try:
+        scraper.browser.get(scraper.entry_url)
+        scraper.setup()
+
+        for url in scraper.get_url_list():
+            scraper.reset_state()
+            links = scraper.list_url(url)
+            job_queue.enqueue('oddsportal', scraper.getUrlSeason(url),
+                              ((link, link, scraper.partial_store.pop(link)) for link in dict.fromkeys(links)))
+            print("Queued {0} games from: {1}".format(len(links), url))
+    finally:
+        scraper.browser.close()
+
+
+def handle_jobs(jobs, root_url='https://www.oddsportal.com', archive_dir=None):
+    # One browser per batch of jobs, closed when the batch is done
+    scraper = NHLScraper(seasonsToScrape=[], outputLoc=None, root_url=root_url, archive=open_archive(archive_dir))
+
+    try:
+        scraper.browser.get(scraper.entry_url)
+        scraper.setup()
+
+        for job in jobs:
+            stored = scraper.complete_job(job.url, job.payload)
+            yield job, stored if stored else None, 'Unable to extract odds from: ' + job.url
+    finally:
+        scraper.browser.close()
+
+
+def export_season(job_queue, season, output_loc, archive_dir=None, processes=4, parser=None):
+    # Same Season{N}.json as a direct scrape, in the order the games were listed. With an archive the jobs only stored
+    # partial records, which are completed from the snapshots here
+    stored = [(link, partial) for link, partials in job_queue.results('oddsportal', season, orderBy='rowid')
+              for partial in partials]
+
+    if archive_dir is not None:
+        records = parse_matches(archive_dir, stored, processes, parser)
+    else:
+        records = [partial for _, partial in stored]
+
+    with open(output_loc + 'Season' + str(season) + '.json', 'w+') as fp:
+        json.dump(records, fp)
+
+    ingestSeason(season, output_loc)
+
+
+# Parse stage, building season files from an archive without a browser
+
+
+def parse_archived_match(args):
+    archive_dir, link, partial, parser = args
+    snapshot = SnapshotArchive(archive_dir).get(link)
+
+    if snapshot is None:
+        print('No snapshot of: ' + link)
+        return None
+
+    try:
+        return parse_match(partial, snapshot['odds-data-table'], snapshot['date'], get_parser(parser))
+    except Exception:
+        print('Unable to extract odds from: ' + link)
+        return None
+
+
+def parse_matches(archive_dir, matches, processes=4, parser=None):
+    # matches is a list of (link, partial record). Returns the completed records in the same order, leaving out games
+    # that could not be parsed
+    tasks = [(archive_dir, link, partial, parser) for link, partial in matches]
+
+    with multiprocessing.Pool(processes) as pool:
+        records = pool.map(parse_archived_match, tasks, chunksize=max(1, len(tasks) // (processes * 4)))
+
+    return [record for record in records if record is not None]
+
+
+def parse_archive(archive_dir, seasons, output_loc, root_url='https://www.oddsportal.com', processes=4, parser=None):
+    # Replays the crawl over the archived results pages, then parses every season's match pages on a process pool
+    archive = SnapshotArchive(archive_dir)
+    scraper = NHLScraper(seasonsToScrape=seasons, outputLoc=output_loc, root_url=root_url, parser=parser)
+    entry = archive.get(scraper.entry_url)
+
+    if entry is None:
+        print('No snapshot of: ' + scraper.entry_url)
+        return
+
+    for url in scraper.parse_season_urls(entry['main-filter']):
+        season = scraper.getUrlSeason(url)
+        scraper.reset_state()
+        links = scraper.list_archived_url(archive, url)
+        started = time.time()
+
+        records = parse_matches(archive_dir, [(link, scraper.partial_store.pop(link)) for link in dict.fromkeys(links)],
+                                processes, parser)
+
+        with open(output_loc + 'Season' + str(season) + '.json', 'w+') as fp:
+            json.dump(records, fp)
+
+        ingestSeason(season, output_loc)
+
+        print(str(datetime.datetime.now()) + ': Parsed ' + str(len(records)) + '/' + str(len(set(links))) +
+              ' games from ' + str(season) + ' in ' + str(round(time.time() - started, 1)) + 's')
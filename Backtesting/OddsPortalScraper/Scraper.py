@@ -1,59 +1,82 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
-
-'''
-Author: Alex Foley
-Date Modified: 2019-08-14
-Python Version: 3.7
-
-Scraper interface for pulling from OddsPortal. Scraper functions as follows:
- - webpage at entry_url will be opened
- - scraper.setup will be called
- - scraper.get_url_list will be called
- - scraper.extract_from_urls will be called (on the resulting list)
-'''
-
-
-class Scraper(object):
-    def __init__(self, entry_url, root_url, store=[]):
-        self.entry_url = entry_url
-        self.root_url = root_url
-        self.store = store
-        self._browser = None
-
-    @property
-    def browser(self):
-        if self._browser is None:
-            self._browser = webdriver.Firefox()
-        return self._browser
-
-    def get_url_list(self):
-        raise NotImplementedError("get_url_list is required on type Scraper")
-
-    def extract_from_urls(self, urls_to_scrape):
-        raise NotImplementedError("extract_from_urls is required on type Scraper")
-
-    def setup(self):
-        raise NotImplementedError("setup is required on type Scraper")
-
-    def relative_path(self, path, root=None):
-        if root is None:
-            root = self.root_url
-        return root + path
-
-    def get_lazy_element_by_id(self, _id, timeout=15):
-        return WebDriverWait(self.browser, timeout).until(
-            EC.presence_of_element_located((By.ID, _id))
-        )
-
-    def scrape(self):
-        try:
-            self.browser.get(self.entry_url)
-            self.setup()
-            urls_to_scrape = self.get_url_list()
-            self.extract_from_urls(urls_to_scrape)
-        finally:
-            self.browser.close()
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+'''
+Author: Alex Foley
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Scraper interface for pulling from OddsPortal. Scraper functions as follows:
+ - webpage at entry_url will be opened
+ - scraper.setup will be called
+ - scraper.get_url_list will be called
+ - scraper.extract_from_urls will be called (on the resulting list)
+'''
+
+
+class Scraper(object):
+    def __init__(self, entry_url, root_url, store=None, headless=False):
+        self.entry_url = entry_url
+        self.root_url = root_url
+        # A default of [] would be one list shared by every scraper
+        self.store = store if store is not None else []
+        self.headless = headless
+        self._browser = None
+
+    @property
+    def browser(self):
+        if self._browser is None:
+            self._browser = self.new_browser()
+        return self._browser
+
+    def new_browser(self):
+        options = Options()
+        options.headless = self.headless
+        return webdriver.Firefox(options=options)
+
+    def get_url_list(self):
+        raise NotImplementedError("get_url_list is required on type Scraper")
+
+    def extract_from_urls(self, urls_to_scrape):
+        raise NotImplementedError("extract_from_urls is required on type Scraper")
+
+    def setup(self):
+        raise NotImplementedError("setup is required on type Scraper")
+
+    def relative_path(self, path, root=None):
+        if root is None:
+            root = self.root_url
+        return root + path
+
+    # Checked every poll_frequency seconds, WebDriverWait's default of 0.5s would add up to half a second to every page.
+    # browser is another session to wait on (see BrowserPool.py), self.browser by default
+    def get_lazy_element_by_id(self, _id, timeout=15, poll_frequency=0.05, browser=None):
+        return WebDriverWait(browser or self.browser, timeout, poll_frequency=poll_frequency).until(
+            EC.presence_of_element_located((By.ID, _id))
+        )
+
+    def wait_for_page_ready(self, timeout=15, poll_frequency=0.05, browser=None):
+        WebDriverWait(browser or self.browser, timeout, poll_frequency=poll_frequency).until(
+            lambda session: session.execute_script('return document.readyState') == 'complete'
+        )
+
+    # page is an element of the document from before a reload. The old document reports readyState 'complete' until the
+    # reload replaces it, so its element going stale is waited for first
+    def wait_for_reload(self, page, timeout=15, poll_frequency=0.05, browser=None):
+        WebDriverWait(browser or self.browser, timeout, poll_frequency=poll_frequency).until(
+            EC.staleness_of(page), 'Page was not reloaded'
+        )
+        self.wait_for_page_ready(timeout, poll_frequency, browser)
+
+    def scrape(self):
+        try:
+            self.browser.get(self.entry_url)
+            self.setup()
+            urls_to_scrape = self.get_url_list()
+            self.extract_from_urls(urls_to_scrape)
+        finally:
+            self.browser.close()
@@ -0,0 +1,70 @@
+import json
+import os
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Per-season JSON lines file (Season{N}.jsonl) that NHLScraper appends each game to as soon as it is scraped, with the
+game's link alongside its record. Links already in the file are skipped when a scrape is rerun, so a killed crawl resumes
+where it stopped. export writes Season{N}.json (the format the backtests read) from the lines file without holding the
+season in memory.
+'''
+
+
+class SeasonSink(object):
+    def __init__(self, output_loc, season):
+        self.path = output_loc + 'Season' + str(season) + '.jsonl'
+        self.json_path = output_loc + 'Season' + str(season) + '.json'
+        self.links = set()
+
+        if os.path.exists(self.path):
+            self.load_links()
+
+    def load_links(self):
+        with open(self.path, mode='rb+') as fp:
+            complete = 0
+
+            for line in fp:
+                if not line.endswith(b'\n'):
+                    # Cut off mid-write by a killed run
+                    break
+
+                self.links.add(json.loads(line.decode('utf-8'))['link'])
+                complete += len(line)
+
+            fp.truncate(complete)
+
+    def __contains__(self, link):
+        return link in self.links
+
+    def __len__(self):
+        return len(self.links)
+
+    def append(self, link, record):
+        with open(self.path, mode='a', encoding='utf-8') as fp:
+            fp.write(json.dumps(dict(record, link=link)) + '\n')
+
+        self.links.add(link)
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding='utf-8') as fp:
+            for line in fp:
+                record = json.loads(line)
+                record.pop('link')
+                yield record
+
+    def export(self):
+        # Same output as json.dump of the list of records, written one record at a time
+        with open(self.json_path, 'w+') as fp:
+            fp.write('[')
+
+            for recordIter, record in enumerate(self.records()):
+                fp.write((', ' if recordIter else '') + json.dumps(record))
+
+            fp.write(']')
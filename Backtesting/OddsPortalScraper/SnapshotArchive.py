@@ -0,0 +1,31 @@
+from Backtesting.ScraperTools.ResponseCache import ResponseCache
+import json
+import os
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Archive of raw HTML snapshots from oddsportal.com, keyed by page URL. A snapshot is the innerHTML of the elements the
+parser needs from a page (e.g. {'tournamentTable': ...} for a results page, {'odds-data-table': ..., 'date': ...} for a
+match), stored gzip compressed in the same layout as ScraperTools/ResponseCache.py. The crawler only saves snapshots and
+parse_archive in NHLScraper.py turns them into odds records, so parser changes never need the site crawled again.
+'''
+
+
+class SnapshotArchive(object):
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.cache = ResponseCache(archive_dir)
+
+    def __contains__(self, url):
+        return os.path.exists(self.cache.path(url))
+
+    def get(self, url):
+        snapshot = self.cache.get(url)
+        return None if snapshot is None else json.loads(snapshot)
+
+    def put(self, url, fragments):
+        self.cache.put(url, json.dumps(fragments))
@@ -0,0 +1,226 @@
+import datetime
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from Backtesting.NBAAPIScraper import APIScraper as NBAAPIScraper
+from Backtesting.NHLAPIScraper import APIScraper as NHLAPIScraper
+from Backtesting.ScraperTools.HTTPClient import HTTPClient, setClient
+from Backtesting.ScraperTools.RetryScheduler import RetryScheduler
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Throughput benchmarks for the scrapers against a StandInServer. Each benchmark scrapes one season with a fresh HTTP
+client pointed at the stand-in (no response cache, so every request goes over the wire) and reports games/s,
+requests/s and the retry overhead: retries as a share of requests sent, and seconds spent parked in backoff.
+
+benchmarkOddsPortalParsing times the OddsPortal page parsers (OddsPortalScraper/PageParser.py) on a corpus of saved
+results and match tables, and checks that every parser reads the same rows from each page.
+
+benchmarkOddsPortalFeeds scrapes the season with OddsPortalScraper/FeedScraper.py from the stand-in's data feeds, for
+comparison with the browser (benchmarkOddsPortal).
+'''
+
+
+class BenchmarkResult(object):
+    def __init__(self, label, games, elapsed, requests, retries=0, backoffSeconds=0.0, failed=0):
+        self.label = label
+        self.games = games
+        self.elapsed = elapsed
+        self.requests = requests
+        self.retries = retries
+        self.backoffSeconds = backoffSeconds
+        self.failed = failed
+
+    def summary(self):
+        elapsed = max(self.elapsed, 1e-9)
+
+        return (self.label + ': ' + str(self.games) + ' games in ' + str(round(self.elapsed, 2)) + 's, ' +
+                str(round(self.games / elapsed, 1)) + ' games/s, ' + str(round(self.requests / elapsed, 1)) +
+                ' requests/s, ' + str(self.retries) + ' retries (' +
+                str(round(100.0 * self.retries / max(self.requests, 1), 1)) + '% of ' + str(self.requests) +
+                ' requests, ' + str(round(self.backoffSeconds, 1)) + 's backoff), ' + str(self.failed) + ' failed')
+
+
+def runBenchmark(label, standIn, maxWorkers, scrape):
+    # scrape(scheduler) returns the number of games scraped
+    httpClient = HTTPClient(baseUrls=standIn.baseUrls())
+    setClient(httpClient)
+
+    scheduler = RetryScheduler(maxWorkers)
+    start = time.monotonic()
+    games = scrape(scheduler)
+    elapsed = time.monotonic() - start
+
+    return BenchmarkResult(label, games, elapsed, httpClient.requestCount, scheduler.retries, scheduler.backoffSeconds,
+                           len(scheduler.failed))
+
+
+def benchmarkNHLFeeds(standIn, season, maxWorkers=8):
+    def scrape(scheduler):
+        gameIds = NHLAPIScraper.getGameIds(season)
+        return sum(1 for gameRecords in NHLAPIScraper.getBaseGameRecordsConcurrent(gameIds, scheduler) if gameRecords)
+
+    return runBenchmark('NHL game feeds', standIn, maxWorkers, scrape)
+
+
+def benchmarkNHLSchedule(standIn, season, maxWorkers=8):
+    def scrape(scheduler):
+        return sum(1 for gameRecords in NHLAPIScraper.getSeasonRecords(season, scheduler) if gameRecords)
+
+    return runBenchmark('NHL bulk schedule', standIn, maxWorkers, scrape)
+
+
+def benchmarkNBA(standIn, season, maxWorkers=8):
+    def scrape(scheduler):
+        gameIdDicts = NBAAPIScraper.getGameIdDicts(season)
+        return sum(1 for gameRecords in NBAAPIScraper.getBaseGameRecordsConcurrent(gameIdDicts, scheduler) if gameRecords)
+
+    return runBenchmark('NBA play-by-play', standIn, maxWorkers, scrape)
+
+
+def benchmarkOddsPortal(standIn, season):
+    # Drives Firefox through the existing page flow, so needs selenium and geckodriver. Requests are counted by the
+    # stand-in since the browser does not go through HTTPClient
+    try:
+        from Backtesting.OddsPortalScraper.NHLScraper import NHLScraper
+    except ImportError as error:
+        print(str(datetime.datetime.now()) + ': Skipping OddsPortal benchmark (' + str(error) + ')')
+        return None
+
+    outputDir = tempfile.mkdtemp()
+    requestsBefore = sum(count for (source, _), count in standIn.counts.items() if source == 'oddsportal')
+
+    try:
+        scraper = NHLScraper(seasonsToScrape=[season], outputLoc=outputDir + '/', root_url=standIn.url() + '/oddsportal')
+        start = time.monotonic()
+        scraper.scrape()
+        elapsed = time.monotonic() - start
+
+        # Games go to the season file rather than the scraper's store
+        with open(os.path.join(outputDir, 'Season' + str(season) + '.json')) as seasonFile:
+            games = len(json.load(seasonFile))
+    except Exception as error:
+        print(str(datetime.datetime.now()) + ': Skipping OddsPortal benchmark (' + str(error).strip() + ')')
+        return None
+    finally:
+        shutil.rmtree(outputDir)
+
+    requests = sum(count for (source, _), count in standIn.counts.items() if source == 'oddsportal') - requestsBefore
+
+    return BenchmarkResult('OddsPortal pages', games, elapsed, requests)
+
+
+def benchmarkOddsPortalFeeds(standIn, season, maxWorkers=8):
+    # FeedScraper reads the same games from the stand-in's data feeds, with no browser
+    from Backtesting.OddsPortalScraper.FeedScraper import FeedScraper
+
+    def scrape(scheduler):
+        outputDir = tempfile.mkdtemp()
+
+        try:
+            FeedScraper(seasonsToScrape=[season], outputLoc=outputDir + '/', scheduler=scheduler).scrape()
+
+            with open(os.path.join(outputDir, 'Season' + str(season) + '.json')) as seasonFile:
+                return len(json.load(seasonFile))
+        finally:
+            shutil.rmtree(outputDir)
+
+    return runBenchmark('OddsPortal feeds', standIn, maxWorkers, scrape)
+
+
+class ParseResult(object):
+    def __init__(self, label, parser, pages, seconds, baselineSeconds=None):
+        self.label = label
+        self.parser = parser
+        self.pages = pages
+        self.seconds = seconds
+        self.baselineSeconds = baselineSeconds
+
+    def summary(self):
+        summary = self.label + ' (' + self.parser + '): ' + str(self.pages) + ' pages, ' + \
+                  str(round(1000 * self.seconds / max(self.pages, 1), 3)) + ' ms/page'
+
+        if self.baselineSeconds is not None:
+            summary += ' (' + str(round(self.baselineSeconds / max(self.seconds, 1e-9), 1)) + 'x soup)'
+
+        return summary
+
+
+def loadParseCorpus(fixtureDir, archiveDir=None):
+    # [(kind, html)] with kind 'results' (tournamentTable) or 'match' (odds-data-table). Fixture files are named by kind,
+    # e.g. results_2018_regular.html. archiveDir adds every page of a SnapshotArchive, e.g. from a real crawl
+    corpus = []
+
+    for fileName in sorted(os.listdir(fixtureDir)):
+        with open(os.path.join(fixtureDir, fileName), encoding='utf-8') as fixtureFile:
+            corpus.append((fileName.split('_')[0], fixtureFile.read()))
+
+    if archiveDir is not None:
+        for folder, _, fileNames in sorted(os.walk(archiveDir)):
+            for fileName in sorted(fileNames):
+                if not fileName.endswith('.gz'):
+                    continue
+
+                with gzip.open(os.path.join(folder, fileName), mode='rt', encoding='utf-8') as snapshotFile:
+                    snapshot = json.load(snapshotFile)
+
+                if 'tournamentTable' in snapshot:
+                    corpus.append(('results', snapshot['tournamentTable']))
+                elif 'odds-data-table' in snapshot:
+                    corpus.append(('match', snapshot['odds-data-table']))
+
+    return corpus
+
+
+def parsePage(parser, kind, html):
+    try:
+        return list(parser.results_rows(html)) if kind == 'results' else parser.odds_rows(html)
+    except Exception as error:
+        return repr(type(error))
+
+
+def benchmarkOddsPortalParsing(fixtureDir, archiveDir=None, repeats=20):
+    from Backtesting.OddsPortalScraper.PageParser import SoupParser, get_parser
+
+    corpus = loadParseCorpus(fixtureDir, archiveDir)
+    parsers = [SoupParser(), get_parser()]
+
+    if parsers[1].name == parsers[0].name:
+        print(str(datetime.datetime.now()) + ': lxml is not installed, only timing the BeautifulSoup parser')
+        parsers = parsers[:1]
+
+    results = []
+
+    for kind, label in [('results', 'OddsPortal results tables'), ('match', 'OddsPortal odds tables')]:
+        pages = [html for pageKind, html in corpus if pageKind == kind]
+        outputs = {}
+        baselineSeconds = None
+
+        for parser in parsers:
+            start = time.monotonic()
+
+            for _ in range(repeats):
+                outputs[parser.name] = [parsePage(parser, kind, html) for html in pages]
+
+            seconds = (time.monotonic() - start) / repeats
+            results.append(ParseResult(label, parser.name, len(pages), seconds, baselineSeconds))
+
+            if baselineSeconds is None:
+                baselineSeconds = seconds
+
+        for parser in parsers[1:]:
+            mismatches = sum(1 for soupRows, rows in zip(outputs['soup'], outputs[parser.name]) if soupRows != rows)
+
+            if mismatches:
+                print(str(datetime.datetime.now()) + ': ' + parser.name + ' read different rows from soup on ' +
+                      str(mismatches) + ' ' + kind + ' pages')
+
+    return results
@@ -0,0 +1,75 @@
+from Backtesting.ScraperBenchmark.Benchmark import *
+from Backtesting.ScraperBenchmark.StandInServer import StandInServer
+from Backtesting.ScraperBenchmark.SyntheticData import SyntheticData
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+import datetime
+import os
+import time
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+'''
+
+
+if __name__ == '__main__':
+    print(str(datetime.datetime.now()) + ': Started')
+
+    season = 2018
+    gamesPerSeason = 200
+    maxWorkers = 8
+
+    # Faults injected by the stand-in (latency is the maximum delay per request, in seconds)
+    latency = 0.05
+    tooManyRate = 0.01
+    resetRate = 0.01
+
+    # Serve responses recorded by a real scrape (its ResponseCache folder) in place of synthetic ones
+    recordDir = None
+
+    # The OddsPortal benchmark drives Firefox, so needs selenium and geckodriver. The OddsPortal feeds benchmark
+    # (OddsPortalScraper/FeedScraper.py) needs neither and always runs
+    benchmarkBrowser = False
+
+    # Only run the stand-in, for pointing scrapers at by hand
+    serveOnly = False
+
+    # OddsPortal parser benchmark over the fixture corpus, plus every page of a snapshot archive (see
+    # OddsPortalScraper/SnapshotArchive.py) if one is given
+    parseFixtureDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Fixtures', 'OddsPortal')
+    parseArchiveDir = None
+
+    standIn = StandInServer(SyntheticData(gamesPerSeason), recordDir, latency, tooManyRate, resetRate=resetRate)
+    standIn.start()
+
+    print(str(datetime.datetime.now()) + ': Stand-in serving ' + str(standIn.baseUrls()))
+
+    if serveOnly:
+        while True:
+            time.sleep(60)
+
+    results = [benchmarkNHLFeeds(standIn, season, maxWorkers),
+               benchmarkNHLSchedule(standIn, season, maxWorkers),
+               benchmarkNBA(standIn, season, maxWorkers),
+               benchmarkOddsPortalFeeds(standIn, season, maxWorkers)]
+
+    if benchmarkBrowser:
+        results.append(benchmarkOddsPortal(standIn, season))
+
+    results += benchmarkOddsPortalParsing(parseFixtureDir, parseArchiveDir)
+
+    for result in results:
+        if result is not None:
+            print(str(datetime.datetime.now()) + ': ' + result.summary())
+
+    print(str(datetime.datetime.now()) + ': Stand-in responses ' +
+          ', '.join(source + ' ' + outcome + ': ' + str(count) for (source, outcome), count in sorted(standIn.counts.items())))
+
+    # Per-endpoint latency, status and retry breakdown over all the benchmarks
+    getTelemetry().printSummary()
+
+    standIn.stop()
+
+    print(str(datetime.datetime.now()) + ': Finished')
@@ -0,0 +1,152 @@
+import collections
+import http.server
+import random
+import socket
+import struct
+import threading
+import time
+import urllib.parse
+
+from Backtesting.ScraperBenchmark.SyntheticData import SyntheticData
+from Backtesting.ScraperTools.ResponseCache import ResponseCache
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Local HTTP stand-in for statsapi.web.nhl.com, data.nba.net and oddsportal.com (with its feed host fb.oddsportal.com).
+Each site is served under its own path prefix (/nhl/, /nba/, /oddsportal/, /oddsportal-feed/) and baseUrls() gives the
+HTTPClient mapping that sends the scrapers there.
+
+Responses are read from recordDir (a ResponseCache written by a real scrape, keyed by the original URL) when present,
+and generated by SyntheticData otherwise. Faults are injected per request: a random delay of up to latency seconds,
+429 Too Many Requests (with Retry-After) at tooManyRate and connection resets at resetRate.
+'''
+
+
+siteUrls = collections.OrderedDict([('nhl', 'https://statsapi.web.nhl.com/'),
+                                    ('nba', 'http://data.nba.net/'),
+                                    ('oddsportal', 'https://www.oddsportal.com/'),
+                                    ('oddsportal-feed', 'https://fb.oddsportal.com/')])
+
+contentTypes = {'nhl': 'application/json', 'nba': 'application/json', 'oddsportal': 'text/html',
+                'oddsportal-feed': 'text/javascript'}
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        standIn = self.server.standIn
+        source, _, path = self.path[1:].partition('/')
+        outcome = standIn.injectFault(source)
+
+        if outcome == 'reset':
+            # Drop the connection with a RST rather than an orderly close
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+        elif outcome == 'tooMany':
+            self.sendBody(429, 'text/plain', 'Too Many Requests', [('Retry-After', str(standIn.retryAfter))])
+        else:
+            response = standIn.respond(source, '/' + path)
+
+            if response is None:
+                outcome = 'notFound'
+                self.sendBody(404, 'text/plain', 'Not Found')
+            else:
+                self.sendBody(200, response[0], response[1])
+
+        standIn.count(source, outcome)
+
+    def sendBody(self, statusCode, contentType, body, headers=()):
+        body = body.encode('utf-8')
+
+        self.send_response(statusCode)
+        self.send_header('Content-Type', contentType + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+
+        for header, value in headers:
+            self.send_header(header, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(object):
+    def __init__(self, syntheticData=None, recordDir=None, latency=0.0, tooManyRate=0.0, retryAfter=1, resetRate=0.0,
+                 faultSources=('nhl', 'nba', 'oddsportal', 'oddsportal-feed'), seed=0, port=0):
+        self.syntheticData = syntheticData if syntheticData is not None else SyntheticData()
+        self.recordCache = ResponseCache(recordDir) if recordDir is not None else None
+        self.latency = latency
+        self.tooManyRate = tooManyRate
+        self.retryAfter = retryAfter
+        self.resetRate = resetRate
+        self.faultSources = faultSources
+        self.port = port
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # Requests served, keyed by (source, outcome) with outcome one of ok, notFound, tooMany or reset
+        self.counts = collections.Counter()
+
+        self.httpServer = None
+
+    def start(self):
+        self.httpServer = http.server.ThreadingHTTPServer(('127.0.0.1', self.port), StandInHandler)
+        self.httpServer.daemon_threads = True
+        self.httpServer.standIn = self
+
+        threading.Thread(target=self.httpServer.serve_forever, daemon=True).start()
+
+        return self.url()
+
+    def stop(self):
+        self.httpServer.shutdown()
+        self.httpServer.server_close()
+
+    def url(self):
+        return 'http://127.0.0.1:' + str(self.httpServer.server_port)
+
+    def baseUrls(self):
+        return {siteUrl: self.url() + '/' + source + '/' for source, siteUrl in siteUrls.items()}
+
+    def injectFault(self, source):
+        with self.lock:
+            delay = self.random.uniform(0, self.latency)
+            draw = self.random.random()
+
+        time.sleep(delay)
+
+        if source not in self.faultSources:
+            return 'ok'
+        elif draw < self.tooManyRate:
+            return 'tooMany'
+        elif draw < self.tooManyRate + self.resetRate:
+            return 'reset'
+
+        return 'ok'
+
+    def respond(self, source, path):
+        if source not in siteUrls:
+            return None
+
+        if self.recordCache is not None:
+            webText = self.recordCache.get(siteUrls[source] + path[1:])
+
+            if webText is not None:
+                return contentTypes[source], webText
+
+        parsedPath = urllib.parse.urlsplit(path)
+        query = dict(urllib.parse.parse_qsl(parsedPath.query))
+
+        return self.syntheticData.respond(source, parsedPath.path, query)
+
+    def count(self, source, outcome):
+        with self.lock:
+            self.counts[(source, outcome)] += 1
@@ -0,0 +1,401 @@
+import collections
+import datetime
+import hashlib
+import json
+import random
+import re
+import time
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Synthetic responses in the shape of statsapi.web.nhl.com, data.nba.net and oddsportal.com (its pages and the
+fb.oddsportal.com data feeds they load), for the stand-in server. Every response is generated from its path alone
+(seeded by it), so the same request always gets the same body and responses line up with each other (a game in a
+schedule has a feed, a match on a results page has an odds page and an odds feed).
+'''
+
+
+nhlTeams = [(1, 'New Jersey Devils', 6, 18), (3, 'New York Rangers', 6, 18), (6, 'Boston Bruins', 6, 17),
+            (8, 'Montréal Canadiens', 6, 17), (10, 'Toronto Maple Leafs', 6, 17), (16, 'Chicago Blackhawks', 5, 16),
+            (17, 'Detroit Red Wings', 6, 17), (22, 'Edmonton Oilers', 5, 15), (23, 'Vancouver Canucks', 5, 15),
+            (54, 'Vegas Golden Knights', 5, 15)]
+
+nbaTeams = [('1610612737', 'ATL'), ('1610612738', 'BOS'), ('1610612744', 'GSW'), ('1610612747', 'LAL'),
+            ('1610612752', 'NYK'), ('1610612755', 'PHI'), ('1610612759', 'SAS'), ('1610612761', 'TOR')]
+
+bookmakers = ['bet365', 'William Hill', 'Bethard', 'Pinnacle', '1xBet', 'Unibet', 'bwin', 'Betway', '888sport',
+              'Marathonbet']
+
+bookiesVersion = '191017151106-1571322325'
+
+
+def slugify(name):
+    return re.sub('[^a-z]+', '-', name.lower().replace('é', 'e')).strip('-')
+
+
+class SyntheticData(object):
+    def __init__(self, gamesPerSeason=200, playsPerGame=300):
+        self.gamesPerSeason = gamesPerSeason
+        self.playsPerGame = playsPerGame
+
+    def gameDate(self, season, gameIndex):
+        return datetime.datetime(season, 10, 3, 23) + datetime.timedelta(hours=gameIndex * 6)
+
+    def pairing(self, season, gameIndex, teams):
+        r = random.Random('pairing' + str(season) + str(gameIndex))
+        return r.sample(teams, 2)
+
+    # NHL
+
+    def nhlGameId(self, season, gameIndex):
+        # Last tenth of the season is playoffs (type 03)
+        gameType = '03' if gameIndex >= self.gamesPerSeason * 9 // 10 else '02'
+        return str(season) + gameType + str(gameIndex + 1).zfill(4)
+
+    def nhlTeam(self, team, detailed=True):
+        teamId, name, conferenceId, divisionId = team
+
+        return {'id': teamId, 'name': name, 'link': '/api/v1/teams/' + str(teamId),
+                'venue': {'name': 'Arena ' + str(teamId), 'city': name.split(' ')[0], 'timeZone': {'id': 'America/New_York'}},
+                'abbreviation': name[:3].upper(), 'teamName': name.split(' ')[-1], 'firstYearOfPlay': '1917',
+                'division': {'id': divisionId, 'name': 'Division ' + str(divisionId)},
+                'conference': {'id': conferenceId, 'name': 'Conference ' + str(conferenceId)},
+                'franchise': {'franchiseId': teamId}, 'active': True} if detailed else {'id': teamId, 'name': name}
+
+    def nhlLinescore(self, gameId):
+        r = random.Random('linescore' + gameId)
+        homeGoals, awayGoals = r.randint(0, 6), r.randint(0, 6)
+        finalPeriod = 3 if homeGoals != awayGoals else r.choice([4, 5])
+
+        if finalPeriod > 3:
+            # Overtime or shootout winner gets the extra goal
+            homeGoals, awayGoals = (homeGoals + 1, awayGoals) if r.random() < 0.5 else (homeGoals, awayGoals + 1)
+
+        return {'currentPeriod': finalPeriod, 'currentPeriodOrdinal': ['1st', '2nd', '3rd', 'OT', 'SO'][finalPeriod - 1],
+                'hasShootout': finalPeriod == 5,
+                'periods': [{'num': period, 'home': {'goals': 0}, 'away': {'goals': 0}} for period in range(1, min(finalPeriod, 4) + 1)],
+                'teams': {'home': {'goals': homeGoals, 'shotsOnGoal': 30, 'goaliePulled': r.random() < 0.2, 'numSkaters': 5, 'powerPlay': False},
+                          'away': {'goals': awayGoals, 'shotsOnGoal': 28, 'goaliePulled': r.random() < 0.2, 'numSkaters': 5, 'powerPlay': False}}}
+
+    def nhlGames(self, season):
+        for gameIndex in range(self.gamesPerSeason):
+            yield gameIndex, self.nhlGameId(season, gameIndex), self.pairing(season, gameIndex, nhlTeams)
+
+    def nhlSchedule(self, season, expand=False):
+        dates = {}
+
+        for gameIndex, gameId, (homeTeam, awayTeam) in self.nhlGames(season):
+            gameDate = self.gameDate(season, gameIndex)
+            game = {'gamePk': int(gameId), 'link': '/api/v1/game/' + gameId + '/feed/live',
+                    'gameType': 'P' if gameId[5] == '3' else 'R', 'season': str(season) + str(season + 1),
+                    'gameDate': gameDate.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'status': {'abstractGameState': 'Final', 'statusCode': '7'},
+                    'teams': {'home': {'score': 0, 'team': self.nhlTeam(homeTeam, expand)},
+                              'away': {'score': 0, 'team': self.nhlTeam(awayTeam, expand)}}}
+
+            if expand:
+                game['linescore'] = self.nhlLinescore(gameId)
+
+            dates.setdefault(gameDate.strftime('%Y-%m-%d'), []).append(game)
+
+        return json.dumps({'copyright': 'NHL', 'totalGames': self.gamesPerSeason,
+                           'dates': [{'date': date, 'games': games} for date, games in sorted(dates.items())]})
+
+    def nhlFeed(self, gameId):
+        season, gameIndex = int(gameId[:4]), int(gameId[6:]) - 1
+        homeTeam, awayTeam = self.pairing(season, gameIndex, nhlTeams)
+        linescore = self.nhlLinescore(gameId)
+        r = random.Random('feed' + gameId)
+
+        def player(playerId):
+            return {'player': {'id': playerId, 'fullName': 'Player ' + str(playerId), 'link': '/api/v1/people/' + str(playerId)},
+                    'playerType': r.choice(['Shooter', 'Goalie', 'Hitter', 'Hittee', 'Winner', 'Loser'])}
+
+        plays = []
+
+        for playIndex in range(self.playsPerGame):
+            team = r.choice([homeTeam, awayTeam])
+            periodSeconds = playIndex * 3600 // self.playsPerGame % 1200
+
+            plays.append({'players': [player(8470000 + r.randint(0, 60)) for _ in range(2)],
+                          'result': {'event': 'Shot', 'eventCode': 'X' + str(playIndex),
+                                     'eventTypeId': r.choice(['SHOT', 'HIT', 'FACEOFF', 'BLOCKED_SHOT', 'GIVEAWAY', 'GOAL']),
+                                     'description': 'Player shot saved by goalie', 'secondaryType': 'Wrist Shot'},
+                          'about': {'eventIdx': playIndex, 'eventId': playIndex, 'period': 1 + playIndex * 3 // self.playsPerGame,
+                                    'periodType': 'REGULAR', 'ordinalNum': '1st',
+                                    'periodTime': '%02d:%02d' % divmod(periodSeconds, 60),
+                                    'periodTimeRemaining': '%02d:%02d' % divmod(1200 - periodSeconds, 60),
+                                    'dateTime': '2018-10-04T00:00:00Z', 'goals': {'away': 0, 'home': 0}},
+                          'coordinates': {'x': float(r.randint(-99, 99)), 'y': float(r.randint(-42, 42))},
+                          'team': {'id': team[0], 'name': team[1], 'link': '/api/v1/teams/' + str(team[0])}})
+
+        boxscoreTeams = {side: {'team': self.nhlTeam(team, False),
+                                'teamStats': {'teamSkaterStats': {'goals': linescore['teams'][side]['goals'], 'pim': 4, 'shots': 30}},
+                                'players': {'ID' + str(playerId): {'person': {'id': playerId, 'fullName': 'Player ' + str(playerId)},
+                                                                   'stats': {'skaterStats': {'timeOnIce': '15:00', 'goals': 0, 'shots': 2}}}
+                                            for playerId in range(8470000, 8470022)}}
+                         for side, team in [('home', homeTeam), ('away', awayTeam)]}
+
+        return json.dumps({'copyright': 'NHL', 'gamePk': int(gameId), 'link': '/api/v1/game/' + gameId + '/feed/live',
+                           'metaData': {'wait': 10, 'timeStamp': '20181004_000000'},
+                           'gameData': {'game': {'pk': int(gameId), 'season': str(season) + str(season + 1),
+                                                 'type': 'P' if gameId[5] == '3' else 'R'},
+                                        'datetime': {'dateTime': self.gameDate(season, gameIndex).strftime('%Y-%m-%dT%H:%M:%SZ')},
+                                        'status': {'abstractGameState': 'Final'},
+                                        'teams': {'away': self.nhlTeam(awayTeam), 'home': self.nhlTeam(homeTeam)},
+                                        'players': {'ID' + str(playerId): {'id': playerId, 'fullName': 'Player ' + str(playerId)}
+                                                    for playerId in range(8470000, 8470044)}},
+                           'liveData': {'plays': {'allPlays': plays, 'scoringPlays': [], 'penaltyPlays': []},
+                                        'linescore': linescore, 'boxscore': {'teams': boxscoreTeams},
+                                        'decisions': {}}})
+
+    # NBA
+
+    def nbaGameId(self, season, gameIndex):
+        gameType = '4' if gameIndex >= self.gamesPerSeason * 9 // 10 else '2'
+        return '00' + gameType + str(season)[2:] + str(gameIndex + 1).zfill(5)
+
+    def nbaPeriods(self, gameId):
+        return 4 if random.Random('periods' + gameId).random() < 0.9 else 5
+
+    def nbaSchedule(self, season):
+        games = []
+
+        for gameIndex in range(self.gamesPerSeason):
+            gameId = self.nbaGameId(season, gameIndex)
+            (homeId, homeCode), (awayId, awayCode) = self.pairing(season, gameIndex, nbaTeams)
+
+            games.append({'gameId': gameId, 'seasonStageId': int(gameId[2]), 'statusNum': 3,
+                          'gameUrlCode': self.gameDate(season, gameIndex).strftime('%Y%m%d') + '/' + awayCode + homeCode,
+                          'startTimeUTC': self.gameDate(season, gameIndex).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                          'period': {'current': self.nbaPeriods(gameId), 'type': 0, 'maxRegular': 4},
+                          'hTeam': {'teamId': homeId, 'score': ''}, 'vTeam': {'teamId': awayId, 'score': ''}})
+
+        return json.dumps({'_internal': {'pubDateTime': '2019-06-14'}, 'league': {'standard': games}})
+
+    def nbaPlayByPlay(self, gameId, period):
+        r = random.Random('pbp' + gameId)
+        homeScore = awayScore = 0
+
+        # Scores carry on from the previous periods, so replay them
+        for earlierPeriod in range(1, period + 1):
+            plays = []
+            periodLength = 720 if earlierPeriod < 5 else 300
+            playCount = self.playsPerGame // 4
+
+            for playIndex in range(playCount):
+                timeLeft = periodLength - playIndex * periodLength / playCount
+
+                if r.random() < 0.3:
+                    homeScore += r.choice([1, 2, 2, 3])
+                if r.random() < 0.3:
+                    awayScore += r.choice([1, 2, 2, 3])
+
+                clock = '%d:%02d' % divmod(int(timeLeft), 60) if timeLeft >= 60 else '%.1f' % (timeLeft % 60)
+                plays.append({'clock': clock if ':' in clock else '0:' + clock.zfill(4), 'eventMsgType': '1',
+                              'description': 'Jump shot', 'personId': '201939', 'teamId': '1610612744',
+                              'vTeamScore': str(awayScore), 'hTeamScore': str(homeScore), 'isScoreChange': True})
+
+        return json.dumps({'_internal': {'pubDateTime': '2019-06-14'}, 'plays': plays})
+
+    # OddsPortal
+
+    def oddsPortalEntry(self, seasons):
+        links = ''.join('<li><a href="/hockey/usa/nhl-' + str(season) + '-' + str(season + 1) + '/results/">' +
+                        str(season) + '/' + str(season + 1) + '</a></li>' for season in seasons)
+
+        return ('<html><head><script>function changeOddsFormat(format) { location.reload(); }</script></head><body>'
+                '<div class="main-filter"><ul><li><a href="/hockey/usa/nhl/results/">NHL</a></li></ul></div>'
+                '<div class="main-filter"><ul><li><a href="/hockey/usa/nhl/results/">Current</a></li>' + links +
+                '</ul></div></body></html>')
+
+    def oddsPortalMatches(self, season):
+        for gameIndex in range(self.gamesPerSeason):
+            (_, homeName, _, _), (_, awayName, _, _) = self.pairing(season, gameIndex, nhlTeams)
+            matchId = 'm' + str(season) + str(gameIndex).zfill(5)
+
+            yield gameIndex, homeName.replace('é', 'e'), awayName.replace('é', 'e'), matchId
+
+    def oddsPortalSeason(self, season):
+        # Every match is on the first page, with pagination listing only that page
+        rows = ['<tr class="dark center"><th class="first2 tl" colspan="7">NHL</th></tr>']
+        state = None
+
+        for gameIndex, homeName, awayName, matchId in self.oddsPortalMatches(season):
+            rowState = self.gameDate(season, gameIndex).strftime('%d %b %Y') + \
+                       (' - Play Offs' if gameIndex >= self.gamesPerSeason * 9 // 10 else '')
+
+            if rowState != state:
+                state = rowState
+                rows.append('<tr class="center nob-border"><th class="first2 tl" colspan="3"><span>' + state +
+                            '</span></th><th>1</th><th>X</th><th>2</th><th>B\'s</th></tr>')
+
+            href = '/hockey/usa/nhl-' + str(season) + '-' + str(season + 1) + '/' + slugify(homeName) + '-' + \
+                   slugify(awayName) + '-' + matchId + '/'
+            rows.append('<tr class="odd deactivate"><td class="table-time">23:00</td>'
+                        '<td class="name table-participant"><a href="' + href + '">' + homeName + ' - ' + awayName +
+                        '</a></td><td class="center bold table-score">3:2</td><td>1.9</td><td>4.1</td><td>3.6</td>'
+                        '<td>10</td></tr>')
+
+        return ('<html><body><div id="pagination"><a href="#/page/1/">1</a></div>'
+                '<table class=" table-main" id="tournamentTable"><tbody>' + ''.join(rows) + '</tbody></table>'
+                '<script>var page = new PageTournament(' + json.dumps({'id': 't' + str(season), 'sid': 4, 'cid': 200}) +
+                ');</script></body></html>')
+
+    def oddsPortalOdds(self, matchId):
+        # [(bookmaker id, bookmaker, home odds, tie odds, away odds)], the same for the match page and its feed
+        r = random.Random('odds' + matchId)
+        odds = []
+
+        for bookmakerIter, bookmaker in enumerate(bookmakers):
+            homeOdds = round(r.uniform(1.5, 3.5), 2)
+            awayOdds = round(r.uniform(1.5, 3.5), 2)
+            odds.append((str(bookmakerIter + 1), bookmaker, homeOdds, round(r.uniform(3.8, 4.6), 2), awayOdds))
+
+        return odds
+
+    def oddsPortalHash(self, matchId):
+        return hashlib.md5(('xhash' + matchId).encode('utf-8')).hexdigest()[:8]
+
+    def oddsPortalMatch(self, season, matchId):
+        gameIndex = int(matchId[5:])
+        date = self.gameDate(season, gameIndex)
+        rows = []
+
+        for _, bookmaker, homeOdds, tieOdds, awayOdds in self.oddsPortalOdds(matchId):
+            rows.append('<tr class="lo odd"><td><div class="l"><a class="name" href="/bookmaker/' + slugify(bookmaker) +
+                        '/link/">' + bookmaker + '</a></div></td><td class="right odds">' + str(homeOdds) +
+                        '</td><td class="right odds">' + str(tieOdds) +
+                        '</td><td class="right odds">' + str(awayOdds) + '</td><td class="center info-value">95.0%</td></tr>')
+
+        # The page script holds the event id and the (URL encoded) hash the odds feed is requested with. The date is
+        # rendered from the start time in its class, in the local time zone
+        event = {'id': matchId, 'sid': 4, 'cid': 200, 'archive': True,
+                 'xhash': ''.join('%' + format(ord(c), 'x') for c in self.oddsPortalHash(matchId)), 'isLive': False}
+
+        return ('<html><head><script src="/res/x/bookies-' + bookiesVersion + '.js"></script></head><body>'
+                '<p class="date datet t' + str(int(time.mktime(date.timetuple()))) + '-1-1-0-0">' +
+                date.strftime('%A, %d %b %Y, %H:%M') + '</p><div id="odds-data-table"><div class="table-container">'
+                '<table class="table-main detail-odds sortable"><thead><tr><th>Bookmakers</th><th>1</th><th>X</th>'
+                '<th>2</th><th>Payout</th></tr></thead><tbody>' + ''.join(rows) + '</tbody></table></div></div>'
+                '<script>var page = new PageEvent(' + json.dumps(event) + ');</script></body></html>')
+
+    def oddsPortalBookmakers(self):
+        data = {str(bookmakerIter + 1): {'WebName': bookmaker, 'WebUrl': '/bookmaker/' + slugify(bookmaker) + '/link/'}
+                for bookmakerIter, bookmaker in enumerate(bookmakers)}
+
+        return 'var bookmakersData=' + json.dumps(data) + ';var bookmakersPreviewOnly={};'
+
+    # OddsPortal data feeds (fb.oddsportal.com), JSONP wrapped
+
+    def oddsPortalResultsFeed(self, season):
+        # The results table and pagination of the season page, which is a single page
+        html = self.oddsPortalSeason(season)
+        table = html[html.index('<table'):html.index('</table>') + len('</table>')]
+        path = '/ajax-sport-country-tournament-archive/4/t' + str(season) + '/X0/1/0/1/'
+
+        pagination = '<div id="pagination"><a href="#/page/1/" x-page="1">1</a></div>'
+
+        return ('globals.jsonpCallback(' + json.dumps(path) + ', ' +
+                json.dumps({'s': 1, 'd': {'html': table + pagination}}) + ');')
+
+    def oddsPortalMovement(self, outcomeId, bookmakerId, start, currentOdds):
+        # Earlier odds of one bookmaker and outcome as the feed lists them, newest first as [odds, change, time], and
+        # the time the current odds were set. A random walk back from the current odds over the week before the game
+        r = random.Random('history' + outcomeId + '-' + bookmakerId)
+        changeTime = start - r.randint(60, 3600)
+        times = sorted((r.randint(start - 7 * 86400, changeTime - 60) for _ in range(r.randint(0, 12))), reverse=True)
+        movement = []
+        odds = currentOdds
+
+        for moveTime in times:
+            previous = max(1.01, round(odds + r.choice([-1, 1]) * r.uniform(0.01, 0.15), 2))
+            movement.append([previous, 1 if odds < previous else -1, moveTime])
+            odds = previous
+
+        return movement, changeTime
+
+    def oddsPortalMatchFeed(self, matchId):
+        odds = self.oddsPortalOdds(matchId)
+        start = int(time.mktime(self.gameDate(int(matchId[1:5]), int(matchId[5:])).timetuple()))
+        path = '/feed/match/1-4-' + matchId + '-1-2-' + self.oddsPortalHash(matchId) + '.dat'
+        outcomeIds = [matchId + 'h', matchId + 'x', matchId + 'a']
+        outcome = {'odds': collections.OrderedDict((bookmakerId, [homeOdds, tieOdds, awayOdds])
+                                                   for bookmakerId, _, homeOdds, tieOdds, awayOdds in odds),
+                   'act': {bookmakerId: True for bookmakerId, _, _, _, _ in odds},
+                   'OutcomeID': {str(outcomeIter): outcomeId for outcomeIter, outcomeId in enumerate(outcomeIds)},
+                   'change_time': {}}
+        history = {outcomeId: {} for outcomeId in outcomeIds}
+
+        for bookmakerId, _, homeOdds, tieOdds, awayOdds in odds:
+            changeTimes = []
+
+            for outcomeId, currentOdds in zip(outcomeIds, [homeOdds, tieOdds, awayOdds]):
+                movement, changeTime = self.oddsPortalMovement(outcomeId, bookmakerId, start, currentOdds)
+                changeTimes.append(changeTime)
+
+                if movement:
+                    history[outcomeId][bookmakerId] = movement
+
+            outcome['change_time'][bookmakerId] = changeTimes
+
+        feed = {'s': 1, 'd': {'bt': 1, 'sc': 2, 'oddsdata': {'back': {'E-1-2-0-0-0': outcome}},
+                              'history': {'back': history}}}
+
+        return 'globals.jsonpCallback(' + json.dumps(path) + ', ' + json.dumps(feed) + ');'
+
+    def respond(self, source, path, query):
+        # Returns (content type, body) for a request path on one of the stand-in sources, or None if not found
+        match = re.match(r'^/api/v1/schedule$', path)
+
+        if source == 'nhl' and match and 'season' in query:
+            season = int(query['season'][:4])
+            return 'application/json', self.nhlSchedule(season, 'schedule.linescore' in query.get('expand', ''))
+
+        match = re.match(r'^/api/v1/game/([0-9]{10})/feed/live$', path)
+
+        if source == 'nhl' and match:
+            return 'application/json', self.nhlFeed(match.group(1))
+
+        match = re.match(r'^/data/10s/prod/v1/([0-9]{4})/schedule\.json$', path)
+
+        if source == 'nba' and match:
+            return 'application/json', self.nbaSchedule(int(match.group(1)))
+
+        match = re.match(r'^/data/10s/prod/v1/[0-9]{8}/([0-9]{10})_pbp_([0-9]+)\.json$', path)
+
+        if source == 'nba' and match:
+            return 'application/json', self.nbaPlayByPlay(match.group(1), int(match.group(2)))
+
+        if source == 'oddsportal' and path == '/hockey/usa/nhl/results/':
+            return 'text/html', self.oddsPortalEntry(range(2005, 2019))
+
+        match = re.match(r'^/hockey/usa/nhl-([0-9]{4})-[0-9]{4}/results/$', path)
+
+        if source == 'oddsportal' and match:
+            return 'text/html', self.oddsPortalSeason(int(match.group(1)))
+
+        match = re.match(r'^/hockey/usa/nhl-([0-9]{4})-[0-9]{4}/[a-z-]+-(m[0-9]{9})/$', path)
+
+        if source == 'oddsportal' and match:
+            return 'text/html', self.oddsPortalMatch(int(match.group(1)), match.group(2))
+
+        if source == 'oddsportal' and path == '/res/x/bookies-' + bookiesVersion + '.js':
+            return 'text/javascript', self.oddsPortalBookmakers()
+
+        match = re.match(r'^/ajax-sport-country-tournament-archive/4/t([0-9]{4})/X0/1/0/1/$', path)
+
+        if source == 'oddsportal-feed' and match:
+            return 'text/javascript', self.oddsPortalResultsFeed(int(match.group(1)))
+
+        match = re.match(r'^/feed/match/1-4-(m[0-9]{9})-1-2-([0-9a-f]+)\.dat$', path)
+
+        # A feed requested with the wrong hash is not found, as on the real site
+        if source == 'oddsportal-feed' and match and match.group(2) == self.oddsPortalHash(match.group(1)):
+            return 'text/javascript', self.oddsPortalMatchFeed(match.group(1))
+
+        return None
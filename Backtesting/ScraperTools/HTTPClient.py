@@ -0,0 +1,193 @@
+import collections
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from Backtesting.ScraperTools.ResponseCache import ResponseCache
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+HTTP client shared by the scrapers that call the league APIs. A single pooled Session keeps connections alive between
+requests (so only the first request to a host pays for the TCP and TLS handshakes) and asks for gzip compressed bodies.
+Schedule endpoints are revalidated with If-None-Match/If-Modified-Since: when the server answers 304 Not Modified, the
+body from the previous response is reused instead of being downloaded again. Validators (ETag, Last-Modified and the
+body) are kept in memory and stored with the cached responses (or in validatorDir), so a later run revalidates too.
+
+If a rate limiter is set (see RateLimiter.py), every request that goes to the network first waits for a token from it.
+
+If a response cache is set, successful responses are stored in it and later requests for the same URL are served from
+it. Revalidated URLs (schedules) change during a season, so outside replay mode they are always requested (with their
+validators) rather than served from the cache. cacheable(url, webText), if given, decides which responses are stored,
+so a scraper can keep out the feeds of games that have not finished. In replay mode a URL missing from the cache raises
+CacheMissError instead of being fetched.
+
+Connection failures, timeouts and bodies cut off or garbled in transit are raised as ConnectionResetError, which the
+callers already handle and retry. Other errors from requests (e.g. too many redirects) are raised as they are.
+
+Every response's latency, status and size, and any rate limit wait, is recorded in the process's Telemetry.
+
+baseUrls redirects requests to another server, e.g. {'https://statsapi.web.nhl.com/': 'http://127.0.0.1:8000/nhl/'}
+sends every NHL API request to a local stand-in (see ScraperBenchmark) without changing the scrapers.
+'''
+
+
+HTTPResponse = collections.namedtuple('HTTPResponse', ['status_code', 'text', 'headers'])
+
+
+class CacheMissError(LookupError):
+    pass
+
+
+class HTTPClient(object):
+    def __init__(self, poolSize=16, timeout=30, revalidatePaths=('/schedule',), validatorDir=None, baseUrls=None):
+        self.timeout = timeout
+        self.baseUrls = baseUrls if baseUrls is not None else {}
+        self.revalidatePaths = revalidatePaths
+        self.responseCache = None
+        self.cacheable = None
+        self.rateLimiter = None
+
+        # Requests sent over the network (cache hits are not counted)
+        self.requestCount = 0
+
+        # Validators (ETag, Last-Modified and body) are kept in memory, and on disk in validatorDir if it is given or
+        # else next to the cached responses
+        self.validators = {}
+        self.validatorCache = ResponseCache(validatorDir) if validatorDir is not None else None
+        self.validatorLock = threading.Lock()
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=poolSize)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+
+    def validatorStore(self):
+        return self.validatorCache if self.validatorCache is not None else self.responseCache
+
+    def getValidator(self, url):
+        with self.validatorLock:
+            validator = self.validators.get(url)
+
+        validatorStore = self.validatorStore()
+
+        if validator is None and validatorStore is not None:
+            cachedValidator = validatorStore.get(url, '.validator.gz')
+            validator = json.loads(cachedValidator) if cachedValidator is not None else None
+
+        return validator
+
+    def putValidator(self, url, validator):
+        with self.validatorLock:
+            self.validators[url] = validator
+
+        validatorStore = self.validatorStore()
+
+        if validatorStore is not None:
+            validatorStore.put(url, json.dumps(validator), '.validator.gz')
+
+    def setResponseCache(self, cacheDir, replay=False, cacheable=None):
+        self.responseCache = ResponseCache(cacheDir, replay) if cacheDir is not None else None
+        self.cacheable = cacheable
+
+    def rewriteUrl(self, url):
+        for baseUrl, replacementUrl in self.baseUrls.items():
+            if url.startswith(baseUrl):
+                return replacementUrl + url[len(baseUrl):]
+
+        return url
+
+    def get(self, url):
+        url = self.rewriteUrl(url)
+        revalidate = any(path in url for path in self.revalidatePaths)
+
+        if self.responseCache is not None and (self.responseCache.replay or not revalidate):
+            webText = self.responseCache.get(url)
+
+            if webText is not None:
+                getTelemetry().recordResponse(url, 'cached')
+                return HTTPResponse(200, webText, {})
+            elif self.responseCache.replay:
+                raise CacheMissError('No cached response (replay mode) for ' + url)
+
+        headers = {}
+        validator = self.getValidator(url) if revalidate else None
+
+        if validator is not None:
+            if validator['etag']:
+                headers['If-None-Match'] = validator['etag']
+            if validator['lastModified']:
+                headers['If-Modified-Since'] = validator['lastModified']
+
+        if self.rateLimiter is not None:
+            waited = self.rateLimiter.acquire(url)
+
+            if waited:
+                getTelemetry().increment('scraper_rate_limit_seconds_total', {'host': urlsplit(url).hostname}, waited)
+
+        with self.validatorLock:
+            self.requestCount += 1
+
+        started = time.monotonic()
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError) as error:
+            getTelemetry().recordResponse(url, 'reset', time.monotonic() - started)
+            raise ConnectionResetError(str(error))
+
+        getTelemetry().recordResponse(url, response.status_code, time.monotonic() - started, len(response.content))
+
+        if response.status_code == 304 and validator is not None:
+            # Unchanged since the last request, so reuse the body we already have
+            return HTTPResponse(200, validator['body'], response.headers)
+
+        if 200 <= response.status_code < 300:
+            if self.responseCache is not None and (self.cacheable is None or self.cacheable(url, response.text)):
+                self.responseCache.put(url, response.text)
+
+            if revalidate:
+                etag = response.headers.get('ETag')
+                lastModified = response.headers.get('Last-Modified')
+
+                if etag or lastModified:
+                    self.putValidator(url, {'etag': etag, 'lastModified': lastModified, 'body': response.text})
+
+        return HTTPResponse(response.status_code, response.text, response.headers)
+
+
+# Shared by every caller in the process, replace with setClient to change settings
+client = None
+clientPid = None
+clientLock = threading.Lock()
+
+
+def getClient():
+    global client, clientPid
+
+    with clientLock:
+        # A forked worker process must not reuse its parent's connections
+        if client is None or clientPid != os.getpid():
+            client = HTTPClient()
+            clientPid = os.getpid()
+
+        return client
+
+
+def setClient(httpClient):
+    global client, clientPid
+
+    with clientLock:
+        client = httpClient
+        clientPid = os.getpid()
@@ -0,0 +1,148 @@
+import collections
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Durable queue of scrape jobs in a SQLite file, shared by any number of local worker processes. A job is one unit of
+fetching (a game, or a match page) identified by (source, season, key), with the URL to fetch and any details the
+source needs to parse it (payload).
+
+Workers lease a batch of pending jobs for leaseSeconds and then complete or fail each one. A completed job keeps its
+parsed result (pickled), so a season can be written out once all of its jobs are done, by whichever process runs the
+export. If a worker dies its leases expire and the jobs go back to pending; a job whose leases expire or that fails
+maxAttempts times is marked failed. A job is only completed or failed by the worker holding its current lease, so a
+worker whose lease ran out cannot overwrite the work of the one the job was leased to next. Enqueueing is idempotent:
+jobs already in the table keep their status (failed jobs are put back to pending), so a killed rebuild is resumed by
+running it again.
+
+Statuses: pending, leased, done, failed.
+'''
+
+
+Job = collections.namedtuple('Job', ['source', 'season', 'key', 'url', 'payload', 'attempts', 'worker'])
+
+
+class JobQueue(object):
+    def __init__(self, queuePath, leaseSeconds=600, maxAttempts=3):
+        self.queuePath = queuePath
+        self.leaseSeconds = leaseSeconds
+        self.maxAttempts = maxAttempts
+        self.connection = None
+        self.connectionPid = None
+
+        self.execute('CREATE TABLE IF NOT EXISTS jobs (source TEXT NOT NULL, season INTEGER NOT NULL, key TEXT NOT NULL, '
+                     'url TEXT NOT NULL, payload TEXT, status TEXT NOT NULL DEFAULT \'pending\', '
+                     'attempts INTEGER NOT NULL DEFAULT 0, leaseExpiry REAL, worker TEXT, error TEXT, result BLOB, '
+                     'PRIMARY KEY (source, season, key))')
+        self.execute('CREATE INDEX IF NOT EXISTS jobStatus ON jobs (source, status)')
+
+    def connect(self):
+        # Connections cannot be shared with forked processes, so each process opens its own
+        if self.connection is None or self.connectionPid != os.getpid():
+            self.connection = sqlite3.connect(self.queuePath, timeout=60, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connectionPid = os.getpid()
+
+        return self.connection
+
+    def execute(self, sql, parameters=()):
+        return self.connect().execute(sql, parameters)
+
+    def transaction(self, runStatements):
+        # runStatements(connection) runs inside one write transaction, which no other process can interleave with
+        connection = self.connect()
+        connection.execute('BEGIN IMMEDIATE')
+
+        try:
+            result = runStatements(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+        return result
+
+    def enqueue(self, source, season, jobs):
+        # jobs is an iterable of (key, url, payload), payload being anything json serialisable
+        def runStatements(connection):
+            connection.executemany('INSERT OR IGNORE INTO jobs (source, season, key, url, payload) VALUES (?, ?, ?, ?, ?)',
+                                   ((source, season, str(key), url, json.dumps(payload)) for key, url, payload in jobs))
+            connection.execute('UPDATE jobs SET status = \'pending\', attempts = 0, error = NULL '
+                               'WHERE source = ? AND season = ? AND status = \'failed\'', (source, season))
+
+        self.transaction(runStatements)
+
+    def requeueExpired(self, connection):
+        connection.execute('UPDATE jobs SET status = CASE WHEN attempts >= ? THEN \'failed\' ELSE \'pending\' END, '
+                           'worker = NULL, error = \'Lease expired\' WHERE status = \'leased\' AND leaseExpiry < ?',
+                           (self.maxAttempts, time.time()))
+
+    def lease(self, source, batchSize, worker):
+        def runStatements(connection):
+            self.requeueExpired(connection)
+
+            rows = connection.execute('SELECT rowid, source, season, key, url, payload, attempts FROM jobs '
+                                      'WHERE source = ? AND status = \'pending\' ORDER BY season, key LIMIT ?',
+                                      (source, batchSize)).fetchall()
+            connection.executemany('UPDATE jobs SET status = \'leased\', attempts = attempts + 1, leaseExpiry = ?, '
+                                   'worker = ? WHERE rowid = ?',
+                                   ((time.time() + self.leaseSeconds, worker, row[0]) for row in rows))
+
+            return rows
+
+        return [Job(source, season, key, url, json.loads(payload), attempts + 1, worker)
+                for _, source, season, key, url, payload, attempts in self.transaction(runStatements)]
+
+    def renew(self, worker):
+        self.execute('UPDATE jobs SET leaseExpiry = ? WHERE status = \'leased\' AND worker = ?',
+                     (time.time() + self.leaseSeconds, worker))
+
+    # complete and fail only change a job still held under the lease it was handed out with (the same worker and
+    # attempt), returning False if the lease was lost, e.g. the job expired and was leased again or already finished
+
+    def complete(self, job, result):
+        return self.execute('UPDATE jobs SET status = \'done\', worker = NULL, error = NULL, result = ? '
+                            'WHERE source = ? AND season = ? AND key = ? AND status = \'leased\' AND worker = ? '
+                            'AND attempts = ?',
+                            (pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), job.source, job.season, job.key,
+                             job.worker, job.attempts)).rowcount > 0
+
+    def fail(self, job, reason):
+        # Back to pending for another worker unless out of attempts
+        return self.execute('UPDATE jobs SET status = CASE WHEN attempts >= ? THEN \'failed\' ELSE \'pending\' END, '
+                            'worker = NULL, error = ? WHERE source = ? AND season = ? AND key = ? '
+                            'AND status = \'leased\' AND worker = ? AND attempts = ?',
+                            (self.maxAttempts, reason, job.source, job.season, job.key, job.worker,
+                             job.attempts)).rowcount > 0
+
+    def statusCounts(self, source):
+        # {season: {status: count}}
+        self.transaction(self.requeueExpired)
+
+        counts = collections.defaultdict(dict)
+
+        for season, status, count in self.execute('SELECT season, status, COUNT(*) FROM jobs WHERE source = ? '
+                                                  'GROUP BY season, status', (source,)):
+            counts[season][status] = count
+
+        return counts
+
+    def failures(self, source, season):
+        return self.execute('SELECT key, error FROM jobs WHERE source = ? AND season = ? AND status = \'failed\' '
+                            'ORDER BY key', (source, season)).fetchall()
+
+    def results(self, source, season, orderBy='key'):
+        # Yields (key, result) of every done job of the season, ordered by key or by rowid (order enqueued)
+        orderBy = 'rowid' if orderBy == 'rowid' else 'key'
+
+        for key, result in self.execute('SELECT key, result FROM jobs WHERE source = ? AND season = ? AND status = \'done\' '
+                                        'ORDER BY ' + orderBy, (source, season)):
+            yield key, pickle.loads(result)
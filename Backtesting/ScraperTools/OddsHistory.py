@@ -0,0 +1,189 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from Backtesting.ScraperTools.OddsStore import oddsColumns, seasonGames, stageColumns
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Line movement store for the OddsPortal odds: every snapshot of the odds of each game, bookmaker and outcome, in
+HistoricalOdds/Season{N}.history.parquet next to the odds store (OddsStore.py). Snapshots come from the 'history' of
+each record in Season{N}.json, {bookmaker: {'home.odds': [[seconds from the start, odds], ...], ...}}, which
+OddsPortalScraper/FeedScraper.py reads from the odds feeds. Games scraped without one (the browser only sees the odds
+after the game) have their odds as the only snapshot, at the start of the game.
+
+Rows are sorted by game, bookmaker, outcome and time, so each series of snapshots is contiguous, and snapshots that do
+not change the odds are dropped. Within a series, seconds and odds are stored as the change from the previous snapshot
+(the first row of a series holds the value itself), and parquet dictionary and run length encodes every column, so the
+game, bookmaker and outcome columns cost next to nothing and a snapshot takes about 6 bytes, most of it the time.
+
+Columns:
+    game        int32     position of the game in Season{N}.json
+    bookmaker   category
+    outcome     int8      0 home, 1 tie, 2 away (the order of oddsColumns)
+    seconds     int32     time relative to the start of the game (negative before it)
+    odds        int32     decimal odds in thousandths
+
+readHistory decodes the table to absolute seconds and decimal odds. oddsAsOf gives every bookmaker's odds at a point in
+time and closingOdds their last odds before each game started, both in the layout of OddsStore.readOdds (a game nobody
+had priced yet keeps its row without a bookmaker), so bestOdds works on them as it does on the scraped odds.
+'''
+
+
+def seriesStarts(game, bookmaker, outcome):
+    # True on the first row of each (game, bookmaker, outcome) series of rows sorted by them
+    starts = np.ones(len(game), dtype=bool)
+    starts[1:] = (game[1:] != game[:-1]) | (bookmaker[1:] != bookmaker[:-1]) | (outcome[1:] != outcome[:-1])
+
+    return starts
+
+
+def encodeDeltas(values, starts):
+    deltas = np.diff(values, prepend=0)
+    deltas[starts] = values[starts]
+
+    return deltas
+
+
+def decodeDeltas(deltas, starts):
+    # Running sum of the changes, restarted at the first row of each series
+    totals = np.cumsum(deltas, dtype=np.int64)
+    seriesIndex = np.cumsum(starts) - 1
+
+    return totals - (totals - deltas)[np.flatnonzero(starts)][seriesIndex]
+
+
+def tableStarts(table):
+    return seriesStarts(table['game'].to_numpy(), table['bookmaker'].cat.codes.to_numpy(), table['outcome'].to_numpy())
+
+
+def ingestHistory(season, oddsDir='HistoricalOdds/'):
+    # Encodes the snapshots in Season{N}.json and writes Season{N}.history.parquet, returning the encoded table
+    with open(oddsDir + 'Season' + str(season) + '.json', mode='r') as oddsFile:
+        records = json.load(oddsFile)
+
+    seriesGames = []
+    seriesBookmakers = []
+    seriesOutcomes = []
+    lengths = []
+    snapshots = []
+
+    for game in seasonGames(records).index:
+        history = records[game].get('history', {})
+
+        for bookmaker, bookmakerOdds in records[game]['odds'].items():
+            for outcome, column in enumerate(oddsColumns):
+                series = history[bookmaker][column] if bookmaker in history else [[0, bookmakerOdds[column]]]
+
+                seriesGames.append(game)
+                seriesBookmakers.append(bookmaker)
+                seriesOutcomes.append(outcome)
+                lengths.append(len(series))
+                snapshots += series
+
+    bookmakers = pd.Categorical(seriesBookmakers)
+    bookmakers = pd.Categorical.from_codes(np.repeat(bookmakers.codes, lengths), bookmakers.categories)
+    snapshots = np.asarray(snapshots, dtype=np.float64).reshape(-1, 2)
+
+    table = pd.DataFrame({'game': np.repeat(np.asarray(seriesGames, dtype=np.int32), lengths),
+                          'bookmaker': bookmakers,
+                          'outcome': np.repeat(np.asarray(seriesOutcomes, dtype=np.int8), lengths),
+                          'seconds': np.round(snapshots[:, 0]).astype(np.int64),
+                          'odds': np.round(snapshots[:, 1] * 1000).astype(np.int64)})
+
+    table = table.sort_values(['game', 'bookmaker', 'outcome', 'seconds'], kind='mergesort').reset_index(drop=True)
+
+    # Snapshots that repeat the odds before them
+    oddsValues = table['odds'].to_numpy()
+    changed = tableStarts(table)
+    changed[1:] |= oddsValues[1:] != oddsValues[:-1]
+    table = table.loc[changed].reset_index(drop=True)
+
+    starts = tableStarts(table)
+
+    for column in ['seconds', 'odds']:
+        table[column] = encodeDeltas(table[column].to_numpy(), starts).astype(np.int32)
+
+    try:
+        table.to_parquet(oddsDir + 'Season' + str(season) + '.history.parquet', index=False)
+    except ImportError as error:
+        # No parquet engine (pyarrow) installed, so the table is rebuilt from the JSON on every read
+        print('Not writing odds history store (' + str(error) + ')')
+
+    return table
+
+
+def readHistory(season, oddsDir='HistoricalOdds/'):
+    # Every snapshot of the season's odds, ingesting Season{N}.json first if the store is missing or older than it
+    storePath = oddsDir + 'Season' + str(season) + '.history.parquet'
+    jsonPath = oddsDir + 'Season' + str(season) + '.json'
+
+    if not os.path.exists(storePath) or (os.path.exists(jsonPath) and os.path.getmtime(jsonPath) > os.path.getmtime(storePath)):
+        table = ingestHistory(season, oddsDir)
+    else:
+        table = pd.read_parquet(storePath)
+
+    starts = tableStarts(table)
+    history = table[['game', 'bookmaker', 'outcome']].copy()
+    history['seconds'] = decodeDeltas(table['seconds'].to_numpy(np.int64), starts)
+    history['odds'] = decodeDeltas(table['odds'].to_numpy(np.int64), starts) / 1000.0
+
+    return history
+
+
+def oddsAsOf(history, odds, asOf):
+    # Every bookmaker's latest odds at or before asOf (a time, or a Series of times indexed by game), in the layout of
+    # OddsStore.readOdds. odds is the season's readOdds table, which gives each game's teams, start and stage.
+    # Bookmakers that had not priced all three outcomes by then are left out, and a game none had priced gets the row
+    # without a bookmaker
+    games = odds.drop_duplicates('game').set_index('game')[['date', 'home', 'away'] + stageColumns]
+
+    if isinstance(asOf, pd.Series):
+        cutoff = (asOf.reindex(games.index) - games['date']).dt.total_seconds()
+    else:
+        cutoff = (pd.Timestamp(asOf) - games['date']).dt.total_seconds()
+
+    seen = history.loc[history['seconds'].to_numpy() <= cutoff.reindex(history['game'].to_numpy()).to_numpy()]
+
+    # Each series is sorted by time, so the latest snapshot seen is the last row of the series
+    gameValues = seen['game'].to_numpy()
+    bookmakerCodes = seen['bookmaker'].cat.codes.to_numpy()
+    outcomes = seen['outcome'].to_numpy()
+    last = np.ones(len(seen), dtype=bool)
+    last[:-1] = seriesStarts(gameValues, bookmakerCodes, outcomes)[1:]
+
+    gameValues = gameValues[last]
+    bookmakerCodes = bookmakerCodes[last]
+
+    # One row per game and bookmaker, with a column per outcome
+    pairStarts = np.ones(len(gameValues), dtype=bool)
+    pairStarts[1:] = (gameValues[1:] != gameValues[:-1]) | (bookmakerCodes[1:] != bookmakerCodes[:-1])
+    latest = np.full((int(pairStarts.sum()), len(oddsColumns)), np.nan)
+    latest[np.cumsum(pairStarts) - 1, outcomes[last]] = seen['odds'].to_numpy()[last]
+
+    complete = ~np.isnan(latest).any(axis=1)
+    pairGames = gameValues[pairStarts][complete]
+    unpriced = games.index.difference(pairGames).to_numpy()
+
+    latest = np.concatenate([latest[complete], np.full((len(unpriced), len(oddsColumns)), np.nan)])
+    codes = np.concatenate([bookmakerCodes[pairStarts][complete], np.full(len(unpriced), -1)])
+
+    table = games.reindex(np.concatenate([pairGames, unpriced])).reset_index()
+    table['bookmaker'] = pd.Categorical.from_codes(codes, seen['bookmaker'].cat.categories)
+
+    for columnIter, column in enumerate(oddsColumns):
+        table[column] = latest[:, columnIter]
+
+    table = table.sort_values('game', kind='mergesort').reset_index(drop=True)
+
+    return table[['game', 'date', 'home', 'away'] + stageColumns + ['bookmaker'] + oddsColumns]
+
+
+def closingOdds(history, odds):
+    # Every bookmaker's last odds before each game started
+    return oddsAsOf(history, odds, odds.drop_duplicates('game').set_index('game')['date'])
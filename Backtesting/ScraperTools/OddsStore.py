@@ -0,0 +1,223 @@
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Flat columnar store of the OddsPortal odds in HistoricalOdds/Season{N}.json, one row per game and bookmaker instead of
+one row per game holding a nested dict of bookmakers. Each season is ingested once into Season{N}.parquet next to its
+JSON file, with the bookmaker and team names dictionary encoded (pandas categoricals), and read back as a DataFrame.
+
+Columns:
+    game                          int32     position of the game in Season{N}.json
+    date                          datetime  start time
+    home, away                    category
+    pre-season, regular-season,   bool
+    playoffs
+    bookmaker                     category  missing for a game without any odds
+    home.odds, tie.odds,          float64
+    away.odds
+
+A game without any odds has a single row with no bookmaker and NaN odds, so it is still there to be matched. OddsPortal
+sometimes lists a game twice, which made the backtests' merge find two matches for one game. Listings of the same stage
+and teams with the same start time are dropped at ingest, keeping the first listed (the one the merge used). A rematch
+starts at another time, so it is kept.
+
+oddsTensor lays the table out as a dense game x bookmaker x outcome array, from which bestOddsSets takes the best odds
+of every game for any number of sets of allowed bookmakers in one masked max (bestOdds is the case of a single set).
+
+matchOdds joins the per game odds from bestOdds onto the backtests' games: each game takes the odds of the game with the
+same home and away teams starting nearest to it within mergeWindow, for all three outcomes at once. Games are matched
+whether or not the allowed bookmakers priced them, as the per game merge did, and an unpriced match gets 0. matchOddsSets
+does the same for several sets of bookmakers, joining the games only once.
+'''
+
+
+mergeWindow = pd.Timedelta(hours=10)
+
+stageColumns = ['pre-season', 'regular-season', 'playoffs']
+oddsColumns = ['home.odds', 'tie.odds', 'away.odds']
+
+
+def dropDuplicateGames(games):
+    # games has one row per game in listing order. Keeps a game unless an earlier one has the same stage, teams and
+    # start time
+    return games.loc[~games.duplicated(['pre-season', 'home', 'away', 'date'])]
+
+
+def seasonGames(records):
+    # One row per record of Season{N}.json (teams, start time and stage), indexed by position, duplicates dropped
+    games = pd.DataFrame({'home': [record['home'] for record in records],
+                          'away': [record['away'] for record in records],
+                          'date': pd.to_datetime([record['day'] + ' ' + record['time'] for record in records],
+                                                 format='%d %b %Y %H:%M')})
+
+    for column in stageColumns:
+        games[column] = [bool(record[column]) for record in records]
+
+    return dropDuplicateGames(games)
+
+
+def ingestSeason(season, oddsDir='HistoricalOdds/'):
+    # Normalises Season{N}.json into the long table and writes Season{N}.parquet, returning the table
+    with open(oddsDir + 'Season' + str(season) + '.json', mode='r') as oddsFile:
+        records = json.load(oddsFile)
+
+    games = seasonGames(records)
+
+    gameIndex = []
+    bookmakers = []
+    odds = []
+
+    for game in games.index:
+        for bookmaker, bookmakerOdds in records[game]['odds'].items():
+            gameIndex.append(game)
+            bookmakers.append(bookmaker)
+            odds.append([bookmakerOdds[column] for column in oddsColumns])
+
+        if not records[game]['odds']:
+            gameIndex.append(game)
+            bookmakers.append(None)
+            odds.append([np.nan] * len(oddsColumns))
+
+    gameIndex = np.asarray(gameIndex, dtype=np.int32)
+    table = games.loc[gameIndex].reset_index(drop=True)
+    table.insert(0, 'game', gameIndex)
+    table['home'] = table['home'].astype('category')
+    table['away'] = table['away'].astype('category')
+    table['bookmaker'] = pd.Categorical(bookmakers)
+
+    odds = np.asarray(odds, dtype=np.float64).reshape(-1, len(oddsColumns))
+
+    for columnIter, column in enumerate(oddsColumns):
+        table[column] = odds[:, columnIter]
+
+    table = table[['game', 'date', 'home', 'away'] + stageColumns + ['bookmaker'] + oddsColumns]
+
+    try:
+        table.to_parquet(oddsDir + 'Season' + str(season) + '.parquet', index=False)
+    except ImportError as error:
+        # No parquet engine (pyarrow) installed, so the table is rebuilt from the JSON on every read
+        print('Not writing odds store (' + str(error) + ')')
+
+    return table
+
+
+def readOdds(season, oddsDir='HistoricalOdds/'):
+    # The season's long odds table, ingesting Season{N}.json first if the store is missing or older than it
+    storePath = oddsDir + 'Season' + str(season) + '.parquet'
+    jsonPath = oddsDir + 'Season' + str(season) + '.json'
+
+    if not os.path.exists(storePath) or (os.path.exists(jsonPath) and os.path.getmtime(jsonPath) > os.path.getmtime(storePath)):
+        return ingestSeason(season, oddsDir)
+
+    return pd.read_parquet(storePath)
+
+
+def oddsTensor(odds):
+    # The long table as a dense (game x bookmaker x outcome) array, NaN where a bookmaker did not price a game. Returns
+    # the games (date and teams, indexed by game in listing order, unpriced ones included), the bookmakers (the index
+    # of the second axis) and the array
+    games = odds.drop_duplicates('game').set_index('game')[['date', 'home', 'away']].sort_index()
+    bookmakers = pd.Categorical(odds['bookmaker'])
+    priced = bookmakers.codes >= 0
+
+    tensor = np.full((len(games), len(bookmakers.categories), len(oddsColumns)), np.nan)
+    tensor[games.index.get_indexer(odds['game'])[priced], bookmakers.codes[priced]] = \
+        odds[oddsColumns].to_numpy(dtype=np.float64)[priced]
+
+    return games, pd.Index(bookmakers.categories), tensor
+
+
+def bestOddsSets(tensor, bookmakers, bookmakerSets):
+    # Highest odds of each game and outcome over each set of allowed bookmakers, as a (set x game x outcome) array from
+    # oddsTensor, NaN where none of a set priced the game. Every set is reduced in one masked max. Bookmakers not in
+    # bookmakers are ignored
+    masks = np.zeros((len(bookmakerSets), len(bookmakers)), dtype=bool)
+
+    for setIter, bookmakerSet in enumerate(bookmakerSets):
+        positions = bookmakers.get_indexer(list(bookmakerSet))
+        masks[setIter, positions[positions >= 0]] = True
+
+    priced = np.where(np.isnan(tensor), -np.inf, tensor)
+    best = np.where(masks[:, np.newaxis, :, np.newaxis], priced[np.newaxis], -np.inf).max(axis=2)
+    best[np.isneginf(best)] = np.nan
+
+    return best
+
+
+def bestOdds(odds, allowedBookmakers):
+    # Highest home, tie and away odds of each game over the allowed bookmakers, one row per game in listing order, NaN
+    # where none of them priced the game. Unpriced games are kept so that matchOdds matches against every listing
+    games, bookmakers, tensor = oddsTensor(odds)
+    best = bestOddsSets(tensor, bookmakers, [allowedBookmakers])[0]
+
+    table = games.copy()
+
+    for columnIter, column in enumerate(oddsColumns):
+        table[column] = best[:, columnIter]
+
+    return table
+
+
+def matchGames(games, oddsGames, window=mergeWindow):
+    # Position in oddsGames (date, home and away columns) of the game matching each row of games, -1 where none does.
+    # Joined on the teams, then on the nearest start within window either side, the first listed winning a tie. Games
+    # more than one could match are reported together
+    left = pd.DataFrame({'row': np.arange(len(games)),
+                         'home': games['home'].to_numpy(dtype=object),
+                         'away': games['away'].to_numpy(dtype=object),
+                         'date': pd.to_datetime(games['date']).to_numpy()})
+
+    right = pd.DataFrame({'listing': np.arange(len(oddsGames)),
+                          'home': oddsGames['home'].to_numpy(dtype=object),
+                          'away': oddsGames['away'].to_numpy(dtype=object),
+                          'oddsDate': oddsGames['date'].to_numpy()})
+
+    candidates = left.merge(right, on=['home', 'away'])
+    candidates['distance'] = (candidates['oddsDate'] - candidates['date']).abs()
+    candidates = candidates.loc[candidates['distance'] <= window].sort_values(['row', 'distance', 'listing'])
+
+    counts = candidates.groupby('row').size()
+    ambiguous = counts.index[counts > 1]
+
+    if len(ambiguous):
+        print(str(datetime.datetime.now()) + ': Merging by time and teams not unique on ' + str(len(ambiguous)) +
+              ' games, taking the nearest: ' + ', '.join(str(date) for date in left['date'].iloc[ambiguous]))
+
+    matched = candidates.drop_duplicates('row')
+    positions = np.full(len(games), -1)
+    positions[matched['row'].to_numpy()] = matched['listing'].to_numpy()
+
+    return positions
+
+
+def matchOdds(games, gameOdds, window=mergeWindow):
+    # [home, tie, away] odds for each row of games (home, away and date columns) from gameOdds (see bestOdds), in the
+    # order of games and 0 where no game matched (see matchGames) or the matched game has no odds
+    positions = matchGames(games, gameOdds, window)
+    found = positions >= 0
+
+    odds = np.zeros((len(games), len(oddsColumns)))
+    odds[found] = np.nan_to_num(gameOdds[oddsColumns].to_numpy(dtype=np.float64)[positions[found]])
+
+    return pd.DataFrame(odds, index=games.index, columns=oddsColumns)
+
+
+def matchOddsSets(games, odds, bookmakerSets, window=mergeWindow):
+    # matchOdds for several sets of allowed bookmakers at once, as a (set x game x outcome) array. Games are joined to
+    # the long table odds once, whichever bookmakers priced them, so a game none of a set priced gets 0 for that set
+    oddsGames, bookmakers, tensor = oddsTensor(odds)
+    positions = matchGames(games, oddsGames, window)
+    found = positions >= 0
+
+    matched = np.zeros((len(bookmakerSets), len(games), len(oddsColumns)))
+    matched[:, found] = np.nan_to_num(bestOddsSets(tensor, bookmakers, bookmakerSets)[:, positions[found]])
+
+    return matched
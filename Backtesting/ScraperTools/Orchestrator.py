@@ -0,0 +1,294 @@
+import datetime
+import multiprocessing
+import os
+import queue
+import time
+
+from Backtesting.ScraperTools.HTTPClient import getClient
+from Backtesting.ScraperTools.JobQueue import JobQueue
+from Backtesting.ScraperTools.RateLimiter import HostRateLimiter
+from Backtesting.ScraperTools.Telemetry import Telemetry, getTelemetry
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Scrapes several seasons at once, one worker process per season. All workers share one HostRateLimiter, so adding
+processes raises throughput without pushing the combined request rate to any API host past its limit. Workers send
+progress through reportProgress and the parent prints games done, games per second and requests per second for each
+season as they run.
+
+scrapeJobs does the same through a JobQueue (see JobQueue.py) instead of one process per season: the games of every
+season are queued, any number of workers lease batches of them, and each season is written out once its jobs are done.
+Work survives the run being killed, and a single large season is split over every worker.
+
+Workers also send snapshots of their Telemetry every telemetryInterval seconds. The parent merges them with its own and
+writes them to metricsPath (Prometheus text format) at every report, then prints a summary of the whole run at the end.
+'''
+
+
+# Set in each worker process by initWorker
+progressQueue = None
+lastTelemetryReport = 0.0
+telemetryInterval = 10
+
+
+def initWorker(rateLimiter, workerProgressQueue, initializer, initArgs):
+    global progressQueue
+    progressQueue = workerProgressQueue
+
+    getClient().rateLimiter = rateLimiter
+
+    if initializer is not None:
+        initializer(*initArgs)
+
+
+def reportProgress(season, gamesDone, gamesTotal):
+    # No-op outside of an orchestrated run, so scrapeSeason functions can always call it
+    if progressQueue is not None:
+        progressQueue.put(('progress', season, gamesDone, gamesTotal, getClient().requestCount, time.time()))
+
+    reportTelemetry()
+
+
+def reportTelemetry():
+    global lastTelemetryReport
+
+    if progressQueue is not None and time.time() - lastTelemetryReport >= telemetryInterval:
+        lastTelemetryReport = time.time()
+        progressQueue.put(('telemetry', getTelemetry().snapshot()))
+
+
+def runTask(function, *args):
+    # Runs a task in a worker, returning the worker's telemetry so the parent has its final counts
+    function(*args)
+
+    return getTelemetry().snapshot()
+
+
+class RunTelemetry(object):
+    # Latest snapshot from each worker process (they are cumulative), merged with this process's own telemetry
+    def __init__(self, metricsPath):
+        self.metricsPath = metricsPath
+        self.snapshots = {}
+        getTelemetry()
+
+    def update(self, snapshot):
+        current = self.snapshots.get(snapshot['pid'])
+
+        if current is None or snapshot['sequence'] > current['sequence']:
+            self.snapshots[snapshot['pid']] = snapshot
+
+    def handleMessage(self, message, progress):
+        if message[0] == 'telemetry':
+            self.update(message[1])
+        elif message[1] in progress:
+            progress[message[1]].update(*message[2:])
+
+    def drain(self, workerProgressQueue, progress):
+        # Pick up anything sent just before the workers finished
+        while True:
+            try:
+                self.handleMessage(workerProgressQueue.get_nowait(), progress)
+            except queue.Empty:
+                break
+
+    def merged(self):
+        telemetry = Telemetry()
+        telemetry.merge(getTelemetry().snapshot())
+
+        for snapshot in self.snapshots.values():
+            telemetry.merge(snapshot)
+
+        return telemetry
+
+    def write(self):
+        if self.metricsPath is not None:
+            self.merged().writePrometheus(self.metricsPath)
+
+
+class SeasonProgress(object):
+    def __init__(self, season):
+        self.season = season
+        self.started = None
+        self.updated = None
+        self.gamesDone = 0
+        self.gamesTotal = 0
+        self.startRequests = None
+        self.requests = 0
+
+    def update(self, gamesDone, gamesTotal, requestCount, updated):
+        if self.started is None:
+            self.started = updated
+            self.startRequests = requestCount
+
+        self.gamesDone = gamesDone
+        self.gamesTotal = gamesTotal
+        self.requests = requestCount - self.startRequests
+        self.updated = updated
+
+    def summary(self):
+        if self.started is None:
+            return str(self.season) + ': waiting'
+
+        summary = str(self.season) + ': ' + str(self.gamesDone) + '/' + str(self.gamesTotal) + ' games'
+        elapsed = self.updated - self.started
+
+        if elapsed > 0:
+            summary += ' (' + str(round(self.gamesDone / elapsed, 2)) + ' games/s, ' + \
+                       str(round(self.requests / elapsed, 2)) + ' requests/s)'
+
+        return summary
+
+
+def scrapeSeasons(seasonList, scrapeSeason, processes=4, hostRates=None, initializer=None, initArgs=(),
+                  reportInterval=30, metricsPath=None):
+    # scrapeSeason(season) must be a top level function (or functools.partial of one) so it can be sent to the workers.
+    # initializer(*initArgs) runs once in each worker, e.g. to set the response cache
+    rateLimiter = HostRateLimiter(hostRates if hostRates is not None else {})
+    workerProgressQueue = multiprocessing.Queue()
+    progress = {season: SeasonProgress(season) for season in seasonList}
+    runTelemetry = RunTelemetry(metricsPath)
+
+    pool = multiprocessing.Pool(processes, initWorker, (rateLimiter, workerProgressQueue, initializer, initArgs))
+
+    try:
+        results = {season: pool.apply_async(runTask, (scrapeSeason, season)) for season in seasonList}
+        lastReport = time.time()
+
+        while not all(result.ready() for result in results.values()):
+            try:
+                runTelemetry.handleMessage(workerProgressQueue.get(timeout=1), progress)
+            except queue.Empty:
+                pass
+
+            if time.time() - lastReport >= reportInterval:
+                lastReport = time.time()
+                runTelemetry.write()
+
+                for seasonProgress in progress.values():
+                    print(str(datetime.datetime.now()) + ': ' + seasonProgress.summary())
+
+        runTelemetry.drain(workerProgressQueue, progress)
+
+        for season, result in results.items():
+            try:
+                runTelemetry.update(result.get())
+                print(str(datetime.datetime.now()) + ': Finished ' + progress[season].summary())
+            except Exception as error:
+                print(str(datetime.datetime.now()) + ': Season ' + str(season) + ' failed (' + repr(error) + ')')
+    finally:
+        pool.close()
+        pool.join()
+
+    runTelemetry.write()
+    runTelemetry.merged().printSummary()
+
+
+def workJobs(queuePath, source, handleJobs, batchSize, leaseSeconds, pollInterval=5):
+    # Worker loop, leases jobs until none are left. handleJobs(jobs) yields (job, result, reason) with result None if
+    # the job failed. Returns the number of jobs completed
+    jobQueue = JobQueue(queuePath, leaseSeconds)
+    worker = str(os.getpid())
+    jobsDone = 0
+
+    while True:
+        jobs = jobQueue.lease(source, batchSize, worker)
+
+        if not jobs:
+            # Jobs leased by other workers come back if their leases expire, so wait for them to finish
+            if not any(counts.get('leased') for counts in jobQueue.statusCounts(source).values()):
+                return jobsDone
+
+            time.sleep(pollInterval)
+            continue
+
+        for job, result, reason in handleJobs(jobs):
+            if result is not None:
+                # Not counted if the lease ran out and the job went to another worker
+                if jobQueue.complete(job, result):
+                    jobsDone += 1
+            else:
+                jobQueue.fail(job, reason)
+
+            jobQueue.renew(worker)
+
+        reportTelemetry()
+
+
+def jobSummary(season, counts, elapsed, startDone):
+    done = counts.get('done', 0)
+    summary = str(season) + ': ' + str(done) + '/' + str(sum(counts.values())) + ' jobs done'
+
+    if counts.get('failed'):
+        summary += ', ' + str(counts['failed']) + ' failed'
+
+    if elapsed > 0:
+        summary += ' (' + str(round((done - startDone) / elapsed, 2)) + ' jobs/s)'
+
+    return summary
+
+
+def scrapeJobs(queuePath, source, seasonList, enqueueSeasons, handleJobs, exportSeason, processes=4, hostRates=None,
+               initializer=None, initArgs=(), batchSize=50, leaseSeconds=600, reportInterval=30, metricsPath=None):
+    # enqueueSeasons(jobQueue, seasonList) queues the jobs, handleJobs(jobs) runs a batch in a worker (see workJobs) and
+    # exportSeason(jobQueue, season) writes out a season's results. All must be top level functions (or
+    # functools.partial of one). Queueing and exporting run in this process, after initializer(*initArgs)
+    if initializer is not None:
+        initializer(*initArgs)
+
+    runTelemetry = RunTelemetry(metricsPath)
+    jobQueue = JobQueue(queuePath, leaseSeconds)
+    enqueueSeasons(jobQueue, seasonList)
+
+    rateLimiter = HostRateLimiter(hostRates if hostRates is not None else {})
+    workerProgressQueue = multiprocessing.Queue()
+    started = time.time()
+    startDone = {season: counts.get('done', 0) for season, counts in jobQueue.statusCounts(source).items()}
+
+    pool = multiprocessing.Pool(processes, initWorker, (rateLimiter, workerProgressQueue, initializer, initArgs))
+
+    try:
+        results = [pool.apply_async(runTask, (workJobs, queuePath, source, handleJobs, batchSize, leaseSeconds))
+                   for _ in range(processes)]
+        lastReport = time.time()
+
+        while not all(result.ready() for result in results):
+            try:
+                runTelemetry.handleMessage(workerProgressQueue.get(timeout=1), {})
+            except queue.Empty:
+                pass
+
+            if time.time() - lastReport >= reportInterval:
+                lastReport = time.time()
+                runTelemetry.write()
+
+                for season, counts in sorted(jobQueue.statusCounts(source).items()):
+                    print(str(datetime.datetime.now()) + ': ' +
+                          jobSummary(season, counts, lastReport - started, startDone.get(season, 0)))
+
+        runTelemetry.drain(workerProgressQueue, {})
+
+        for result in results:
+            try:
+                runTelemetry.update(result.get())
+            except Exception as error:
+                print(str(datetime.datetime.now()) + ': Worker failed (' + repr(error) + ')')
+    finally:
+        pool.close()
+        pool.join()
+
+    statusCounts = jobQueue.statusCounts(source)
+
+    for season in seasonList:
+        exportSeason(jobQueue, season)
+        print(str(datetime.datetime.now()) + ': Finished ' +
+              jobSummary(season, statusCounts.get(season, {}), time.time() - started, startDone.get(season, 0)))
+
+        for key, reason in jobQueue.failures(source, season):
+            print(str(datetime.datetime.now()) + ':     ' + key + ' - ' + str(reason))
+
+    runTelemetry.write()
+    runTelemetry.merged().printSummary()
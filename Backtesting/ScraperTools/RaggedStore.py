@@ -0,0 +1,220 @@
+import glob
+import os
+import threading
+import numpy as np
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Storage for variable length series (e.g. a team's running score through a game), one series per key. Instead of one
+list per row, every series is laid end to end in flat column arrays with an offsets array marking where each key's
+series starts, so reading a season is a handful of array reads and each key's series is a slice (a view, not a copy).
+
+A store is a folder of uncompressed npz parts. RaggedStore appends keys in memory and writes a new part on each flush,
+so a crash can only lose the unflushed part. A part is only moved into place once it is written, so the keys of the
+parts on disk are the store's own log of what it holds (key in store). compact() merges the parts into one. String columns are dictionary
+encoded: each part holds integer codes plus the sorted distinct values, which readRaggedStore merges across parts.
+
+Part layout:
+    keys                 (n, k) str    key of each series (a key is a tuple of k strings)
+    offsets              (n + 1,) int  series i is rows offsets[i]:offsets[i + 1] of every column
+    <column>             (rows,)       numeric column
+    <column>.codes       (rows,) int   dictionary encoded column
+    <column>.dictionary  (d,) str      distinct values, codes index into it
+'''
+
+
+def encodeColumn(values):
+    dictionary, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return codes.astype(np.int32), dictionary
+
+
+class RaggedTable(object):
+    def __init__(self, keys, offsets, columns, dictionaries):
+        self.keys = keys
+        self.offsets = offsets
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+        # Later parts win if a key was written more than once (e.g. refetched after a crash)
+        self.index = {tuple(key): keyIter for keyIter, key in enumerate(keys.tolist())}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return tuple(key) in self.index
+
+    def get(self, key):
+        # Dict of column -> view of the key's series. Dictionary encoded columns are returned as codes
+        keyIter = self.index[tuple(key)]
+        start, end = self.offsets[keyIter], self.offsets[keyIter + 1]
+
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def decode(self, name, codes):
+        return self.dictionaries[name][codes]
+
+
+def readPart(partPath):
+    with np.load(partPath, allow_pickle=False) as part:
+        return {name: part[name] for name in part.files}
+
+
+def combineParts(parts):
+    if len(parts) == 1:
+        return parts[0]
+
+    combined = {'keys': np.concatenate([part['keys'] for part in parts])}
+
+    # Offsets of later parts are shifted by the number of rows before them
+    rowCounts = [int(part['offsets'][-1]) for part in parts]
+    rowStarts = np.concatenate([[0], np.cumsum(rowCounts)[:-1]])
+    combined['offsets'] = np.concatenate([[0]] + [part['offsets'][1:] + rowStart for part, rowStart in zip(parts, rowStarts)])
+
+    for name in parts[0]:
+        if name in ('keys', 'offsets') or name.endswith('.dictionary'):
+            continue
+
+        if name.endswith('.codes'):
+            # Remap each part's codes onto the union of the dictionaries
+            column = name[:-len('.codes')]
+            dictionary = np.unique(np.concatenate([part[column + '.dictionary'] for part in parts]))
+            combined[name] = np.concatenate([np.searchsorted(dictionary, part[column + '.dictionary'])[part[name]].astype(np.int32)
+                                             for part in parts])
+            combined[column + '.dictionary'] = dictionary
+        else:
+            combined[name] = np.concatenate([part[name] for part in parts])
+
+    return combined
+
+
+def readRaggedStore(storeDir):
+    partPaths = sorted(glob.glob(os.path.join(storeDir, 'part*.npz')))
+
+    if not partPaths:
+        raise FileNotFoundError('No ragged store parts in ' + storeDir)
+
+    combined = combineParts([readPart(partPath) for partPath in partPaths])
+
+    columns = {}
+    dictionaries = {}
+
+    for name, values in combined.items():
+        if name in ('keys', 'offsets') or name.endswith('.dictionary'):
+            continue
+
+        if name.endswith('.codes'):
+            column = name[:-len('.codes')]
+            columns[column] = values
+            dictionaries[column] = combined[column + '.dictionary']
+        else:
+            columns[name] = values
+
+    return RaggedTable(combined['keys'], combined['offsets'], columns, dictionaries)
+
+
+class RaggedStore(object):
+    def __init__(self, storeDir, encodedColumns=()):
+        self.storeDir = storeDir
+        self.encodedColumns = set(encodedColumns)
+        self.lock = threading.Lock()
+        self.storedKeys = self.readStoredKeys()
+        self.resetBuffer()
+
+    def readStoredKeys(self):
+        storedKeys = set()
+
+        for partPath in glob.glob(os.path.join(self.storeDir, 'part*.npz')):
+            with np.load(partPath, allow_pickle=False) as part:
+                storedKeys.update(tuple(key) for key in part['keys'].tolist())
+
+        return storedKeys
+
+    def __contains__(self, key):
+        # True once the key's series is in a part on disk
+        return tuple(str(keyPart) for keyPart in key) in self.storedKeys
+
+    def resetBuffer(self):
+        self.keys = []
+        self.lengths = []
+        self.columns = {}
+
+    def append(self, key, series):
+        # series is a dict of column -> 1d array, all of the same length
+        with self.lock:
+            self.keys.append([str(keyPart) for keyPart in key])
+            self.lengths.append(len(next(iter(series.values()))) if series else 0)
+
+            for name, values in series.items():
+                self.columns.setdefault(name, []).append(np.asarray(values))
+
+    def nextPartPath(self):
+        partPaths = glob.glob(os.path.join(self.storeDir, 'part*.npz'))
+        partNums = [int(os.path.basename(partPath)[4:-4]) for partPath in partPaths]
+
+        return os.path.join(self.storeDir, 'part' + str(max(partNums, default=-1) + 1).zfill(6) + '.npz')
+
+    def writePart(self, part):
+        # Written under a temporary name first so readers never see a partial part. np.savez adds .npz to names
+        # without it, so the temporary name keeps the extension
+        partPath = self.nextPartPath()
+        tempPath = os.path.join(self.storeDir, 'tmp' + os.path.basename(partPath))
+        np.savez(tempPath, **part)
+        os.replace(tempPath, partPath)
+
+    def flush(self):
+        with self.lock:
+            if not self.keys:
+                return
+
+            part = {'keys': np.array(self.keys, dtype=str),
+                    'offsets': np.concatenate([[0], np.cumsum(self.lengths)]).astype(np.int64)}
+
+            for name, chunks in self.columns.items():
+                values = np.concatenate(chunks)
+
+                if name in self.encodedColumns:
+                    part[name + '.codes'], part[name + '.dictionary'] = encodeColumn(values)
+                else:
+                    part[name] = values
+
+            os.makedirs(self.storeDir, exist_ok=True)
+            self.writePart(part)
+            self.storedKeys.update(tuple(key) for key in self.keys)
+            self.resetBuffer()
+
+    def compact(self):
+        # Merge every part into one so the store loads without any concatenation
+        self.flush()
+
+        partPaths = sorted(glob.glob(os.path.join(self.storeDir, 'part*.npz')))
+
+        if len(partPaths) < 2:
+            return
+
+        combined = combineParts([readPart(partPath) for partPath in partPaths])
+
+        # Drop keys that were written more than once, keeping the last copy
+        lastIndex = {tuple(key): keyIter for keyIter, key in enumerate(combined['keys'].tolist())}
+
+        if len(lastIndex) != len(combined['keys']):
+            keep = np.array(sorted(lastIndex.values()))
+            rows = np.concatenate([np.arange(combined['offsets'][keyIter], combined['offsets'][keyIter + 1]) for keyIter in keep])
+            lengths = np.diff(combined['offsets'])[keep]
+
+            for name in combined:
+                if name not in ('keys', 'offsets') and not name.endswith('.dictionary'):
+                    combined[name] = combined[name][rows]
+
+            combined['keys'] = combined['keys'][keep]
+            combined['offsets'] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+        # The merged part sorts after the old ones, so if the run dies before they are removed its copies still win
+        self.writePart(combined)
+
+        for partPath in partPaths:
+            os.remove(partPath)
@@ -0,0 +1,54 @@
+import multiprocessing
+import time
+from urllib.parse import urlparse
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Token bucket rate limits per API host, shared by every thread and process of a scrape. Each bucket refills at rate
+tokens per second up to capacity, and every request to the host takes one token (waiting for one if the bucket is
+empty). The bucket state lives in shared memory, so a limiter created before the worker processes start caps the
+combined request rate of all of them, however many seasons are scraped at once.
+'''
+
+
+class TokenBucket(object):
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = multiprocessing.Value('d', capacity, lock=False)
+        self.updated = multiprocessing.Value('d', time.time(), lock=False)
+        self.lock = multiprocessing.Lock()
+
+    def acquire(self):
+        # Returns the number of seconds spent waiting for a token
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens.value = min(self.capacity, self.tokens.value + (now - self.updated.value) * self.rate)
+                self.updated.value = now
+
+                if self.tokens.value >= 1:
+                    self.tokens.value -= 1
+                    return waited
+
+                wait = (1 - self.tokens.value) / self.rate
+
+            # Sleep outside the lock so other requests can check the bucket
+            time.sleep(wait)
+            waited += wait
+
+
+class HostRateLimiter(object):
+    def __init__(self, hostRates):
+        # hostRates maps host -> (requests per second, burst capacity). Hosts not listed are not limited
+        self.buckets = {host: TokenBucket(rate, capacity) for host, (rate, capacity) in hostRates.items()}
+
+    def acquire(self, url):
+        bucket = self.buckets.get(urlparse(url).hostname)
+        return bucket.acquire() if bucket is not None else 0.0
@@ -0,0 +1,47 @@
+import gzip
+import hashlib
+import os
+import threading
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Persistent cache of API response bodies. Each body is gzip compressed and stored under the SHA-256 hash of its URL, so
+re-running a scraper over finished seasons never has to touch the network. In replay mode the cache is the only source
+of data and misses are reported to the caller instead of being fetched. Other data about a URL (e.g. the validators
+HTTPClient revalidates it with) is stored next to its body under another extension.
+'''
+
+
+class ResponseCache(object):
+    def __init__(self, cacheDir, replay=False):
+        self.cacheDir = cacheDir
+        self.replay = replay
+
+    def path(self, url, extension='.gz'):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+        # Fan out over sub-folders so no single folder holds every game of every season
+        return os.path.join(self.cacheDir, key[:2], key + extension)
+
+    def get(self, url, extension='.gz'):
+        try:
+            with gzip.open(self.path(url, extension), mode='rt', encoding='utf-8') as cacheFile:
+                return cacheFile.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, webText, extension='.gz'):
+        cachePath = self.path(url, extension)
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+
+        # Write to a temporary file first so an interrupted run never leaves a truncated body behind
+        tempPath = cachePath + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+
+        with gzip.open(tempPath, mode='wt', encoding='utf-8') as cacheFile:
+            cacheFile.write(webText)
+
+        os.replace(tempPath, cachePath)
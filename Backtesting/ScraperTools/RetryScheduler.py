@@ -0,0 +1,167 @@
+import collections
+import datetime
+import email.utils
+import heapq
+import random
+import time
+import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from Backtesting.ScraperTools.HTTPClient import CacheMissError, getClient
+from Backtesting.ScraperTools.Telemetry import getTelemetry
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Fetches a batch of URLs on a thread pool, retrying failures without holding up the rest of the batch. A URL that fails
+with a 429, 408, 5xx or a dropped connection is parked with an exponential backoff (with jitter, so parked URLs do not
+all return at once) while the workers carry on with the others. A Retry-After header is honoured for every request to
+the server, not just the URL it came back on. Other responses (e.g. 404), other request errors (e.g. too many
+redirects) and URLs that run out of attempts fail permanently and are recorded in failed rather than being retried.
+
+Results are yielded in the order the URLs were given, as soon as every URL before them has finished.
+'''
+
+
+retryStatusCodes = {408, 429, 500, 502, 503, 504}
+
+
+def parseRetryAfter(retryAfter):
+    # Retry-After is either a number of seconds or an HTTP date
+    if retryAfter is None:
+        return None
+
+    try:
+        return max(0.0, float(retryAfter))
+    except ValueError:
+        pass
+
+    try:
+        retryTime = email.utils.parsedate_to_datetime(retryAfter)
+        return max(0.0, (retryTime - datetime.datetime.now(retryTime.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryScheduler(object):
+    def __init__(self, maxWorkers=8, maxAttempts=6, baseDelay=5.0, maxDelay=600.0):
+        self.maxWorkers = maxWorkers
+        self.maxAttempts = maxAttempts
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+
+        # Keys that could not be fetched, mapped to the reason for the last failure
+        self.failed = collections.OrderedDict()
+        self.retries = 0
+        self.backoffSeconds = 0.0
+
+        self.pausedUntil = 0.0
+
+    def backoff(self, attempt):
+        delay = min(self.maxDelay, self.baseDelay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def fetch(self, url):
+        # Runs on a worker thread, exceptions are handled when the result is collected
+        return getClient().get(url)
+
+    def handle(self, key, url, attempt, future):
+        # Returns (webText, None) on success, (None, delay) to retry or (None, None) on permanent failure
+        try:
+            response = future.result()
+        except CacheMissError as error:
+            self.failed[key] = str(error)
+            return None, None
+        except (ConnectionResetError, ConnectionAbortedError) as error:
+            reason = 'Connection to ' + url + ' failed (' + str(error) + ')'
+            delay = self.backoff(attempt)
+        except requests.exceptions.RequestException as error:
+            self.failed[key] = 'Request to ' + url + ' failed (' + type(error).__name__ + ': ' + str(error) + ')'
+            return None, None
+        else:
+            if 200 <= response.status_code < 300:
+                return response.text, None
+
+            reason = 'Received HTTP response code ' + str(response.status_code) + ' from ' + url
+
+            if response.status_code not in retryStatusCodes:
+                self.failed[key] = reason
+                return None, None
+
+            delay = self.backoff(attempt)
+            retryAfter = parseRetryAfter(response.headers.get('Retry-After'))
+
+            if retryAfter is not None:
+                # The server asked us to back off, so hold every request rather than just this one
+                delay = max(delay, retryAfter)
+                self.pausedUntil = max(self.pausedUntil, time.monotonic() + retryAfter)
+
+        if attempt >= self.maxAttempts:
+            self.failed[key] = reason + ' (attempt limit exceeded)'
+            return None, None
+
+        print(str(datetime.datetime.now()) + ': ' + reason + ', retrying in ' + str(round(delay, 1)) + 's')
+
+        self.retries += 1
+        self.backoffSeconds += delay
+        getTelemetry().recordRetry(getClient().rewriteUrl(url), delay)
+
+        return None, delay
+
+    def fetchAll(self, keyedUrls):
+        keyedUrls = list(keyedUrls)
+        attempts = [0] * len(keyedUrls)
+        ready = collections.deque(range(len(keyedUrls)))
+        parked = []
+        inFlight = {}
+        results = {}
+        nextIndex = 0
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            while nextIndex < len(keyedUrls):
+                now = time.monotonic()
+
+                while parked and parked[0][0] <= now:
+                    ready.append(heapq.heappop(parked)[1])
+
+                while ready and len(inFlight) < self.maxWorkers and self.pausedUntil <= now:
+                    index = ready.popleft()
+                    attempts[index] += 1
+                    inFlight[executor.submit(self.fetch, keyedUrls[index][1])] = index
+
+                # Sleep until a request finishes or the next parked URL (or paused server) is due
+                wakeTimes = [parked[0][0]] if parked else []
+                wakeTimes += [self.pausedUntil] if ready and self.pausedUntil > now else []
+                timeout = max(0.0, min(wakeTimes) - now) if wakeTimes else None
+
+                if inFlight:
+                    done, _ = wait(inFlight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        index = inFlight.pop(future)
+                        key, url = keyedUrls[index]
+                        webText, delay = self.handle(key, url, attempts[index], future)
+
+                        if delay is not None:
+                            heapq.heappush(parked, (time.monotonic() + delay, index))
+                        else:
+                            results[index] = webText
+                elif timeout is not None:
+                    time.sleep(timeout)
+
+                while nextIndex in results:
+                    yield keyedUrls[nextIndex][0], results.pop(nextIndex)
+                    nextIndex += 1
+
+    def reportFailures(self, label):
+        if not self.failed:
+            return
+
+        print(str(datetime.datetime.now()) + ': Unable to fetch ' + str(len(self.failed)) + ' ' + label + ': ' +
+              ', '.join(str(key) for key in self.failed))
+
+        for key, reason in self.failed.items():
+            print(str(datetime.datetime.now()) + ':     ' + str(key) + ' - ' + reason)
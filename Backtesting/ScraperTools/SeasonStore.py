@@ -0,0 +1,189 @@
+import csv
+import os
+import pandas as pd
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Season CSV that is built from per-game records. Each record is a flat dict for one row (one side of one game) that
+includes the 'game.id' and 'side' index fields. Records are buffered column by column and flushed to the CSV every
+chunkSize games, so memory stays flat and the cost of a season is linear in the number of games. The CSV has the same
+layout as a DataFrame indexed by (game id, side) written with to_csv.
+
+Alongside the CSV, a checkpoint log records the id of every game whose rows have been flushed, so a run that dies part
+way through a season can resume where it stopped and a mid-season refresh only has to fetch games that are not already
+stored. Rows are always written before their game ids are logged. If a run is killed between the two, the unlogged rows
+are dropped the next time the store is opened and those games are fetched again. A CSV written without a checkpoint log
+(before there was one) is taken as complete: the log is seeded with the game ids already in it and no rows are dropped.
+
+Fields holding a variable length series rather than a single value (e.g. a running score) can be routed to a
+RaggedStore instead of the CSV by passing raggedStores. Such a field's value is a dict of column -> array, stored under
+the row's (game id, side) key. Records without the field store nothing, so per-game series (e.g. play-by-play) can be
+carried on one side's record only. Ragged stores are flushed before the CSV, so logged games always have their series.
+Each ragged store keeps its own log (the keys it holds), so a field can be added to a season already stored: records of
+a game whose rows are already in the CSV only add their ragged fields.
+'''
+
+
+indexFields = ['game.id', 'side']
+
+
+def recordsToFrame(gameRecords):
+    # DataFrame indexed by (game id, side), as the scrapers used to build for each game
+    if not gameRecords:
+        return pd.DataFrame()
+
+    gameFrame = pd.DataFrame(gameRecords).set_index(indexFields)
+    gameFrame.index.names = [None] * len(indexFields)
+
+    return gameFrame
+
+
+class SeasonStore(object):
+    def __init__(self, storePath, chunkSize=50, raggedStores=None):
+        self.storePath = storePath
+        self.raggedStores = raggedStores if raggedStores is not None else {}
+        self.checkpointPath = storePath + '.checkpoint'
+        self.chunkSize = chunkSize
+        self.completed = self.readCheckpoint()
+        self.fieldNames = self.readHeader()
+
+        if self.completed is None:
+            self.completed = self.seedCheckpoint()
+        else:
+            self.dropUnloggedRows()
+
+        self.resetBuffer()
+
+    def readCheckpoint(self):
+        try:
+            with open(self.checkpointPath, mode='r') as checkpointFile:
+                return set(line.strip() for line in checkpointFile if line.strip())
+        except FileNotFoundError:
+            return None
+
+    def storedGameIds(self):
+        # Game ids of the rows already in the CSV, the first field of every line after the header
+        try:
+            with open(self.storePath, mode='r', encoding='utf-8') as dataFile:
+                next(dataFile, None)
+                return [line.split(',', 1)[0] for line in dataFile if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def seedCheckpoint(self):
+        # Logs every game already in a CSV that has no checkpoint, so its rows are kept rather than dropped as unlogged
+        gameIds = list(dict.fromkeys(self.storedGameIds()))
+
+        if gameIds:
+            with open(self.checkpointPath, mode='w') as checkpointFile:
+                checkpointFile.writelines(gameId + '\n' for gameId in gameIds)
+                checkpointFile.flush()
+                os.fsync(checkpointFile.fileno())
+
+        return set(gameIds)
+
+    def readHeader(self):
+        try:
+            with open(self.storePath, mode='r', encoding='utf-8', newline='') as dataFile:
+                header = next(csv.reader(dataFile), None)
+        except FileNotFoundError:
+            return None
+
+        return indexFields + header[len(indexFields):] if header else None
+
+    def dropUnloggedRows(self):
+        try:
+            with open(self.storePath, mode='r', encoding='utf-8') as dataFile:
+                lines = dataFile.readlines()
+        except FileNotFoundError:
+            return
+
+        # First line is the header, the first field of every other line is the game id
+        keptLines = lines[:1] + [line for line in lines[1:] if line.split(',', 1)[0] in self.completed]
+
+        if len(keptLines) != len(lines):
+            with open(self.storePath, mode='w', encoding='utf-8') as dataFile:
+                dataFile.writelines(keptLines)
+
+    def resetBuffer(self):
+        self.columns = {}
+        self.bufferedRows = 0
+        self.bufferedGames = 0
+        self.bufferedGameIds = []
+
+    def isComplete(self, gameId):
+        return str(gameId) in self.completed
+
+    def append(self, gameRecords):
+        # Failed requests produce no records, these are left out of the checkpoint so the next run retries them
+        if not gameRecords:
+            return
+
+        gameId = str(gameRecords[0]['game.id'])
+        rowsStored = gameId in self.completed
+
+        for record in gameRecords:
+            for field, raggedStore in self.raggedStores.items():
+                if field in record:
+                    raggedStore.append((record['game.id'], record['side']), record[field])
+
+            if rowsStored:
+                continue
+
+            record = {key: value for key, value in record.items() if key not in self.raggedStores}
+
+            # Columns missing from a record are left blank, as pd.concat would
+            for key in record:
+                if key not in self.columns:
+                    self.columns[key] = [''] * self.bufferedRows
+
+            for key, column in self.columns.items():
+                column.append(record.get(key, ''))
+
+            self.bufferedRows += 1
+
+        if not rowsStored:
+            self.bufferedGameIds.append(gameId)
+
+        self.bufferedGames += 1
+
+        if self.bufferedGames >= self.chunkSize:
+            self.flush()
+
+    def flush(self):
+        for raggedStore in self.raggedStores.values():
+            raggedStore.flush()
+
+        if self.bufferedRows == 0:
+            self.resetBuffer()
+            return
+
+        writeHeader = self.fieldNames is None
+
+        if writeHeader:
+            self.fieldNames = indexFields + sorted(key for key in self.columns if key not in indexFields)
+
+        columns = [self.columns.get(fieldName, [''] * self.bufferedRows) for fieldName in self.fieldNames]
+
+        with open(self.storePath, mode='a', encoding='utf-8', newline='') as dataFile:
+            writer = csv.writer(dataFile, lineterminator='\n')
+
+            if writeHeader:
+                # Index columns are unnamed, matching DataFrame.to_csv
+                writer.writerow([''] * len(indexFields) + self.fieldNames[len(indexFields):])
+
+            writer.writerows(zip(*columns))
+            dataFile.flush()
+            os.fsync(dataFile.fileno())
+
+        with open(self.checkpointPath, mode='a') as checkpointFile:
+            checkpointFile.writelines(gameId + '\n' for gameId in self.bufferedGameIds)
+            checkpointFile.flush()
+            os.fsync(checkpointFile.fileno())
+
+        self.completed.update(self.bufferedGameIds)
+        self.resetBuffer()
@@ -0,0 +1,280 @@
+import bisect
+import collections
+import datetime
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+Counters and latency histograms for the scrapers, kept per process. HTTPClient, RetryScheduler, the rate limiter and
+the OddsPortal scraper record into getTelemetry(); Orchestrator collects snapshots from its worker processes and merges
+them, writing the result as a Prometheus text file (e.g. for node_exporter's textfile collector) and printing a summary
+of where the run's time went.
+
+Metrics (labels in brackets):
+    scraper_request_duration_seconds   histogram  [endpoint]          time to get a response (excluding waits)
+    scraper_responses_total            counter    [endpoint, status]  status is the HTTP code, reset or cached
+    scraper_response_bytes_total       counter    [endpoint]          decoded body size
+    scraper_retries_total              counter    [endpoint]
+    scraper_backoff_seconds_total      counter    [endpoint]          time retries were parked for
+    scraper_rate_limit_seconds_total   counter    [host]              time spent waiting for a rate limiter token
+    scraper_page_duration_seconds      histogram  [page]              browser page load and parse (OddsPortal)
+    scraper_wait_seconds_total         counter    [reason]            pacing and retry backoff between browser pages
+    scraper_browser_restarts_total     counter                        crashed browser sessions replaced
+    scraper_games_total                counter    [source]            games parsed
+    scraper_run_seconds                gauge                          time since the run started
+'''
+
+
+latencyBuckets = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0]
+
+metricHelp = collections.OrderedDict([
+    ('scraper_request_duration_seconds', ('histogram', 'Time to receive a response, excluding rate limit waits')),
+    ('scraper_responses_total', ('counter', 'Responses by HTTP status (reset for dropped connections, cached for cache hits)')),
+    ('scraper_response_bytes_total', ('counter', 'Bytes of response bodies received')),
+    ('scraper_retries_total', ('counter', 'Requests retried after a failure')),
+    ('scraper_backoff_seconds_total', ('counter', 'Seconds retried requests were parked for')),
+    ('scraper_rate_limit_seconds_total', ('counter', 'Seconds spent waiting for a rate limiter token')),
+    ('scraper_page_duration_seconds', ('histogram', 'Time to load and parse a browser page')),
+    ('scraper_wait_seconds_total', ('counter', 'Seconds spent waiting between browser pages')),
+    ('scraper_browser_restarts_total', ('counter', 'Crashed browser sessions replaced with new ones')),
+    ('scraper_games_total', ('counter', 'Games parsed')),
+    ('scraper_run_seconds', ('gauge', 'Seconds since the run started'))])
+
+
+# Route templates of the endpoints the scrapers request, matched against the end of the path (the stand-in servers of
+# ScraperBenchmark serve them under a prefix). Labels must not hold per game parts of the URL (ids, match slugs, feed
+# hashes), which would give every game its own series
+endpointRoutes = [(re.compile(pattern + '$'), template) for pattern, template in [
+    (r'/api/v1/schedule', '/api/v1/schedule'),
+    (r'/api/v1/game/[0-9]+/feed/live', '/api/v1/game/{id}/feed/live'),
+    (r'/data/10s/prod/v1/[0-9]+/schedule\.json', '/data/10s/prod/v1/{season}/schedule.json'),
+    (r'/data/10s/prod/v1/[0-9]+/[0-9]+_pbp_[0-9]+\.json', '/data/10s/prod/v1/{date}/{id}_pbp_{period}.json'),
+    (r'/feed/match/[^/]+\.dat', '/feed/match/{id}.dat'),
+    (r'/ajax-sport-country-tournament-archive/[^/]+/[^/]+/.*', '/ajax-sport-country-tournament-archive/{n}/{id}/...'),
+    (r'/res/x/bookies-[^/]+\.js', '/res/x/bookies-{version}.js'),
+    (r'/[^/]+/[^/]+/[^/]+/results/', '/{sport}/{country}/{league}/results/'),
+    (r'/[^/]+/[^/]+/[^/]+/[^/]+/', '/{sport}/{country}/{league}/{match}/')]]
+
+
+def endpointLabel(url):
+    # Host and route template, host + '/other' for anything not in endpointRoutes
+    splitUrl = urlsplit(url)
+
+    for pattern, template in endpointRoutes:
+        if pattern.search(splitUrl.path):
+            return splitUrl.netloc + template
+
+    return splitUrl.netloc + '/other'
+
+
+def labelKey(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Telemetry(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.sequence = 0
+
+        # (metric, labels) -> value, and (metric, labels) -> [bucket counts..., +Inf count, sum]
+        self.counters = collections.defaultdict(float)
+        self.histograms = {}
+
+    def increment(self, name, labels, value=1.0):
+        with self.lock:
+            self.counters[(name, labelKey(labels))] += value
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            histogram = self.histograms.setdefault((name, labelKey(labels)), [0] * (len(latencyBuckets) + 1) + [0.0])
+            histogram[bisect.bisect_left(latencyBuckets, value)] += 1
+            histogram[-1] += value
+
+    def recordResponse(self, url, status, seconds=None, size=0):
+        endpoint = endpointLabel(url)
+
+        if seconds is not None:
+            self.observe('scraper_request_duration_seconds', {'endpoint': endpoint}, seconds)
+
+        self.increment('scraper_responses_total', {'endpoint': endpoint, 'status': str(status)})
+
+        if size:
+            self.increment('scraper_response_bytes_total', {'endpoint': endpoint}, size)
+
+    def recordRetry(self, url, delay):
+        endpoint = endpointLabel(url)
+        self.increment('scraper_retries_total', {'endpoint': endpoint})
+        self.increment('scraper_backoff_seconds_total', {'endpoint': endpoint}, delay)
+
+    def snapshot(self):
+        # Plain data, so it can be sent between processes
+        with self.lock:
+            self.sequence += 1
+
+            return {'pid': os.getpid(), 'sequence': self.sequence, 'started': self.started,
+                    'counters': dict(self.counters),
+                    'histograms': {key: list(histogram) for key, histogram in self.histograms.items()}}
+
+    def merge(self, snapshot):
+        with self.lock:
+            self.started = min(self.started, snapshot['started'])
+
+            for key, value in snapshot['counters'].items():
+                self.counters[key] += value
+
+            for key, histogram in snapshot['histograms'].items():
+                merged = self.histograms.setdefault(key, [0] * (len(latencyBuckets) + 1) + [0.0])
+                self.histograms[key] = [total + value for total, value in zip(merged, histogram)]
+
+    def counterTotals(self, name, labelName):
+        totals = collections.defaultdict(float)
+
+        for (metric, labels), value in self.counters.items():
+            if metric == name:
+                totals[dict(labels).get(labelName, '')] += value
+
+        return totals
+
+    def quantile(self, histogram, q):
+        # Upper bound of the bucket holding the q quantile
+        target = q * sum(histogram[:-1])
+        seen = 0
+
+        for bucketIter, count in enumerate(histogram[:-1]):
+            seen += count
+
+            if seen >= target and count:
+                return latencyBuckets[bucketIter] if bucketIter < len(latencyBuckets) else float('inf')
+
+        return 0.0
+
+    def prometheusText(self):
+        lines = []
+        elapsed = time.time() - self.started
+
+        with self.lock:
+            for name, (metricType, helpText) in metricHelp.items():
+                lines += ['# HELP ' + name + ' ' + helpText, '# TYPE ' + name + ' ' + metricType]
+
+                if name == 'scraper_run_seconds':
+                    lines.append(name + ' ' + repr(round(elapsed, 3)))
+
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(name + formatLabels(labels) + ' ' + repr(float(value)))
+
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+
+                    cumulative = 0
+
+                    for bound, count in zip(latencyBuckets + ['+Inf'], histogram[:-1]):
+                        cumulative += count
+                        lines.append(name + '_bucket' + formatLabels(labels + (('le', str(bound)),)) + ' ' + str(cumulative))
+
+                    lines.append(name + '_sum' + formatLabels(labels) + ' ' + repr(float(histogram[-1])))
+                    lines.append(name + '_count' + formatLabels(labels) + ' ' + str(cumulative))
+
+        return '\n'.join(lines) + '\n'
+
+    def writePrometheus(self, metricsPath):
+        # Written under a temporary name and renamed, so a collector never reads half a file
+        tempPath = metricsPath + '.tmp'
+
+        with open(tempPath, mode='w') as metricsFile:
+            metricsFile.write(self.prometheusText())
+
+        os.replace(tempPath, metricsPath)
+
+    def summary(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        lines = ['Run time ' + str(datetime.timedelta(seconds=round(elapsed)))]
+
+        for source, games in sorted(self.counterTotals('scraper_games_total', 'source').items()):
+            lines.append(source + ': ' + str(int(games)) + ' games (' + str(round(games / elapsed, 2)) + ' games/s)')
+
+        statuses = collections.defaultdict(dict)
+
+        for (metric, labels), value in self.counters.items():
+            if metric == 'scraper_responses_total':
+                labels = dict(labels)
+                statuses[labels['endpoint']][labels['status']] = int(value)
+
+        responseBytes = self.counterTotals('scraper_response_bytes_total', 'endpoint')
+        retries = self.counterTotals('scraper_retries_total', 'endpoint')
+        backoff = self.counterTotals('scraper_backoff_seconds_total', 'endpoint')
+        latencies = {dict(labels)['endpoint']: histogram for (metric, labels), histogram in self.histograms.items()
+                     if metric == 'scraper_request_duration_seconds'}
+
+        for endpoint in sorted(set(statuses) | set(retries)):
+            histogram = latencies.get(endpoint)
+            line = endpoint + ': ' + ', '.join(status + ' x' + str(count) for status, count in sorted(statuses[endpoint].items()))
+
+            if histogram is not None and sum(histogram[:-1]):
+                line += ', mean ' + str(round(histogram[-1] / sum(histogram[:-1]), 3)) + 's, p50 <= ' + \
+                        str(self.quantile(histogram, 0.5)) + 's, p95 <= ' + str(self.quantile(histogram, 0.95)) + 's'
+
+            line += ', ' + str(round(responseBytes.get(endpoint, 0) / 1e6, 1)) + ' MB, ' + \
+                    str(int(retries.get(endpoint, 0))) + ' retries (' + str(round(backoff.get(endpoint, 0), 1)) + 's backoff)'
+            lines.append(line)
+
+        # Where the time went, summed over every request thread and process
+        requestSeconds = sum(histogram[-1] for histogram in latencies.values())
+        pageSeconds = sum(histogram[-1] for (metric, _), histogram in self.histograms.items()
+                          if metric == 'scraper_page_duration_seconds')
+        lines.append('Time in requests ' + str(round(requestSeconds, 1)) + 's, browser pages ' + str(round(pageSeconds, 1)) +
+                     's, backoff ' + str(round(sum(backoff.values()), 1)) + 's, rate limit waits ' +
+                     str(round(sum(self.counterTotals('scraper_rate_limit_seconds_total', 'host').values()), 1)) + 's')
+
+        # Browser time spent loading pages (working) against pages that failed and pauses between pages (waiting)
+        failedSeconds = sum(histogram[-1] for (metric, labels), histogram in self.histograms.items()
+                            if metric == 'scraper_page_duration_seconds' and dict(labels)['page'].endswith('(failed)'))
+        waits = self.counterTotals('scraper_wait_seconds_total', 'reason')
+        restarts = sum(self.counterTotals('scraper_browser_restarts_total', '').values())
+
+        if pageSeconds or waits:
+            lines.append('Browser working ' + str(round(pageSeconds - failedSeconds, 1)) + 's, failed pages ' +
+                         str(round(failedSeconds, 1)) + 's, waiting ' + str(round(sum(waits.values()), 1)) + 's (' +
+                         ', '.join(reason + ' ' + str(round(seconds, 1)) + 's' for reason, seconds in sorted(waits.items())) +
+                         '), ' + str(int(restarts)) + ' browser restarts')
+
+        return lines
+
+    def printSummary(self):
+        for line in self.summary():
+            print(str(datetime.datetime.now()) + ': ' + line)
+
+
+def formatLabels(labels):
+    if not labels:
+        return ''
+
+    return '{' + ','.join(name + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+                          for name, value in labels) + '}'
+
+
+# One per process, like the HTTP client, so forked workers start from zero rather than their parent's counts
+telemetry = None
+telemetryPid = None
+telemetryLock = threading.Lock()
+
+
+def getTelemetry():
+    global telemetry, telemetryPid
+
+    with telemetryLock:
+        if telemetry is None or telemetryPid != os.getpid():
+            telemetry = Telemetry()
+            telemetryPid = os.getpid()
+
+        return telemetry
@@ -2,9 +2,9 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import datetime
-import ast
 import copy
 
+from Backtesting.ScraperTools.RaggedStore import readRaggedStore
 from Backtesting.SyntheticControl.tslib.src import tsUtils
 from Backtesting.SyntheticControl.tslib.src.synthcontrol.multisyntheticControl import MultiRobustSyntheticControl
 from Backtesting.SyntheticControl.tslib.src.synthcontrol.syntheticControl import RobustSyntheticControl
@@ -12,7 +12,7 @@ from Backtesting.SyntheticControl.tslib.src.synthcontrol.syntheticControl import
 
 '''
 Author: Jonathan Chow
-Date Modified: 2020-02-16
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Predicts the final score of the NBA playoff games after the first quarter using synthetic control.
@@ -25,12 +25,18 @@ def arbRoundDown(x, base):
 
 def readHistoricalGameData(season):
     with open('HistoricalGameData_WithOT/Season' + str(season) + '.csv', mode='r') as dataFile:
-        data = pd.read_csv(dataFile, encoding='utf-8', index_col=[0, 1])
+        # Game ids are read as strings to keep the leading zeros the running points are stored under
+        data = pd.read_csv(dataFile, encoding='utf-8', index_col=[0, 1], dtype={0: str})
         data.index = [data.index.get_level_values(0).astype(str), data.index.get_level_values(1)]
 
     return data
 
 
+def readRunningPoints(season):
+    # Time and score arrays for every (game id, side), written by NBAAPIScraper
+    return readRaggedStore('HistoricalGameData_WithOT/Season' + str(season) + '_RunningPoints')
+
+
 def checkMatrixRank(keyId, trainingDF, graphId):
     # Check matrix is low rank
     (U, s, Vh) = np.linalg.svd((trainingDF) - np.mean(trainingDF))
@@ -185,23 +191,21 @@ if __name__ == '__main__':
     trainingColumns = ['home', 'away',
                        'game.type',
                        'team.id',
-                       'final.period',
-                       'running.points']
+                       'final.period']
 
     for season in seasonList:
         try:
             historicalGameData = readHistoricalGameData(season)
             historicalGameData = historicalGameData[trainingColumns]
-
-            # This is dangerous, but I control what is written and am lazy so who cares
-            historicalGameData['running.points'] = [ast.literal_eval(pointsTuple) for pointsTuple in historicalGameData['running.points']]
+            runningPoints = readRunningPoints(season)
 
             for gameIndex in range(0, len(historicalGameData), 2):
                 gameDF = pd.DataFrame()
 
                 for side in [0, 1]:
-                    tempDF = pd.DataFrame(historicalGameData['running.points'].iloc[gameIndex + side], columns=['Time', 'RunningPoints' + str(side)])
-                    tempDF['Time'] = [arbRoundDown(int(gtime), timeGran) for gtime in tempDF['Time']]
+                    sidePoints = runningPoints.get(historicalGameData.index[gameIndex + side])
+                    tempDF = pd.DataFrame({'Time': arbRoundDown(sidePoints['time'].astype(int), timeGran),
+                                           'RunningPoints' + str(side): sidePoints['points']})
                     tempDF = tempDF.loc[~tempDF['Time'].duplicated(keep='last')]
 
                     tempDF = tempDF.set_index('Time')
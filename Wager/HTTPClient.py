@@ -0,0 +1,114 @@
+import collections
+import gzip
+import hashlib
+import json
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+
+'''
+Author: Jonathan Chow
+Date Modified: 2026-10-17
+Python Version: 3.7
+
+HTTP client for the wager scripts, kept here rather than shared with Backtesting so that placing wagers does not depend
+on backtesting code. A single pooled Session keeps connections alive between requests and asks for gzip compressed
+bodies. Schedule endpoints are revalidated with If-None-Match/If-Modified-Since: when the server answers 304 Not
+Modified, the body from the previous response is reused instead of being downloaded again. Validators (ETag,
+Last-Modified and the body) are kept in memory, and in validatorDir if it is given so the next run revalidates too.
+
+Connection failures, timeouts and bodies cut off or garbled in transit are raised as ConnectionResetError, which the
+wager scripts already handle.
+'''
+
+
+HTTPResponse = collections.namedtuple('HTTPResponse', ['status_code', 'text', 'headers'])
+
+
+class HTTPClient(object):
+    def __init__(self, timeout=30, revalidatePaths=('/schedule',), validatorDir=None):
+        self.timeout = timeout
+        self.revalidatePaths = revalidatePaths
+        self.validatorDir = validatorDir
+        self.validators = {}
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+
+    def validatorPath(self, url):
+        return os.path.join(self.validatorDir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.validator.gz')
+
+    def getValidator(self, url):
+        if url not in self.validators and self.validatorDir is not None:
+            try:
+                with gzip.open(self.validatorPath(url), mode='rt', encoding='utf-8') as validatorFile:
+                    self.validators[url] = json.load(validatorFile)
+            except FileNotFoundError:
+                pass
+
+        return self.validators.get(url)
+
+    def putValidator(self, url, validator):
+        self.validators[url] = validator
+
+        if self.validatorDir is not None:
+            os.makedirs(self.validatorDir, exist_ok=True)
+            tempPath = self.validatorPath(url) + '.tmp'
+
+            with gzip.open(tempPath, mode='wt', encoding='utf-8') as validatorFile:
+                json.dump(validator, validatorFile)
+
+            os.replace(tempPath, self.validatorPath(url))
+
+    def get(self, url):
+        revalidate = any(path in url for path in self.revalidatePaths)
+        validator = self.getValidator(url) if revalidate else None
+        headers = {}
+
+        if validator is not None:
+            if validator['etag']:
+                headers['If-None-Match'] = validator['etag']
+            if validator['lastModified']:
+                headers['If-Modified-Since'] = validator['lastModified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError) as error:
+            raise ConnectionResetError(str(error))
+
+        if response.status_code == 304 and validator is not None:
+            # Unchanged since the last request, so reuse the body we already have
+            return HTTPResponse(200, validator['body'], response.headers)
+
+        if revalidate and 200 <= response.status_code < 300:
+            etag = response.headers.get('ETag')
+            lastModified = response.headers.get('Last-Modified')
+
+            if etag or lastModified:
+                self.putValidator(url, {'etag': etag, 'lastModified': lastModified, 'body': response.text})
+
+        return HTTPResponse(response.status_code, response.text, response.headers)
+
+
+# Shared by every caller in the process, replace with setClient to change settings
+client = None
+
+
+def getClient():
+    global client
+
+    if client is None:
+        client = HTTPClient()
+
+    return client
+
+
+def setClient(httpClient):
+    global client
+    client = httpClient
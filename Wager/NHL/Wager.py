@@ -1,14 +1,15 @@
 import datetime
 import pandas as pd
 import numpy as np
-import requests
 import json
 from scipy.optimize import curve_fit
 
+from Wager.HTTPClient import HTTPClient, getClient, setClient
+
 
 '''
 Author: Jonathan Chow
-Date Modified: 2019-08-12
+Date Modified: 2026-10-17
 Python Version: 3.7
 
 Generate wager for Markov playoff strategy (See PlayoffMarkEx in Attridge/Backtesting). Only manual requirement are
@@ -42,7 +43,7 @@ def getWinner(data):
 
 def accessAPI(url):
     try:
-        request = requests.get(url)
+        request = getClient().get(url)
 
         if 200 <= request.status_code < 300:
             # Success
@@ -82,13 +83,44 @@ def getGameIds(season):
     return gameIds
 
 
+def decodeFeedFields(nhlJson, fieldPaths):
+    # Nested dicts of only the listed fields (dotted paths) of a game feed. With pysimdjson installed the rest of the
+    # feed, most of it play-by-play, is never turned into Python objects. Without it the whole feed is decoded
+    try:
+        import simdjson
+    except ImportError:
+        return json.loads(nhlJson)
+
+    document = simdjson.Parser().parse(nhlJson)
+    nhlDict = {}
+
+    for fieldPath in fieldPaths:
+        keys = fieldPath.split('.')
+        value = document.at_pointer('/' + '/'.join(keys))
+        node = nhlDict
+
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+
+        node[keys[-1]] = value.as_dict() if isinstance(value, simdjson.Object) else value
+
+    return nhlDict
+
+
 def getBaseGameInformation(gameId, isCurrent):
     baseInformation = pd.DataFrame()
     nhlUrl = 'https://statsapi.web.nhl.com/api/v1/game/' + gameId + '/feed/live'
 
     nhlJson = accessAPI(nhlUrl)
 
-    nhlDict = json.loads(nhlJson)
+    fieldPaths = ['gameData.game.type', 'gameData.datetime.dateTime', 'gameData.teams']
+
+    if not isCurrent:
+        fieldPaths += ['liveData.linescore.currentPeriod',
+                       'liveData.boxscore.teams.home.teamStats.teamSkaterStats.goals',
+                       'liveData.boxscore.teams.away.teamStats.teamSkaterStats.goals']
+
+    nhlDict = decodeFeedFields(nhlJson, fieldPaths)
 
     baseInformation['game.type'] = [nhlDict['gameData']['game']['type']] * 2
     baseInformation['game.date'] = [datetime.datetime.strptime(nhlDict['gameData']['datetime']['dateTime'][:-4], '%Y-%m-%dT%H:%M')] * 2
@@ -333,6 +365,9 @@ def getWager(odds, wagerMultiplier):
 if __name__ == '__main__':
     print(str(datetime.datetime.now()) + ': Started')
 
+    # Keep schedule validators between runs so an unchanged schedule is not downloaded again
+    setClient(HTTPClient(validatorDir='ResponseValidators/'))
+
     with open('GameOdds.csv', mode='r') as dataFile:
         gameOdds = pd.read_csv(dataFile, encoding='utf-8', index_col=[0, 1])
         gameOdds.index = [gameOdds.index.get_level_values(0).astype(str), gameOdds.index.get_level_values(1)]